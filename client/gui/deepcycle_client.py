@@ -9,9 +9,16 @@ import numpy as np
 import json
 import time
 from PIL import ImageFont, ImageDraw, Image
+from frame_transport import FrameSender
 
 UDP_IP = "192.168.0.31"
 
+# AI 서버 전송 설정 (청크 전송이므로 64KB 제한 없음)
+CAMERA_SOURCE_ID = 1
+SEND_WIDTH = 480
+SEND_HEIGHT = 360
+JPEG_QUALITY = 90
+
 from_class = uic.loadUiType("deepcycle_client.ui")[0]
 
 name_map = {
@@ -26,7 +33,8 @@ name_map = {
     "Glass & Multi-layer Packaging": "이물질 유리병",
     "PET & Multi-layer Packaging": "이물질 페트병",
     "Styrofoam": "스티로폼",
-    "Battery": "배터리"
+    "Battery": "배터리",
+    "Contaminated": "이물질 (일반쓰레기)"
 }
 
 class YoloReceiver(QThread):
@@ -104,6 +112,7 @@ class WindowClass(QMainWindow, from_class):
         self.udp_ip = UDP_IP
         self.udp_port = 1234
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.frame_sender = FrameSender(self.sock, (self.udp_ip, self.udp_port), CAMERA_SOURCE_ID)
 
         self.yolo_result = None
         self.prev_class_name = "없음"
@@ -173,14 +182,15 @@ class WindowClass(QMainWindow, from_class):
 
     def updateCamera(self):
         retval, image = self.video.read()
+        capture_ts = time.time()
         if retval:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             height, width, _ = image_rgb.shape
 
             if self.yolo_result and 'box' in self.yolo_result:
                 x1, y1, x2, y2 = map(int, self.yolo_result['box'])
-                scale_x = width / 480
-                scale_y = height / 360
+                scale_x = width / SEND_WIDTH
+                scale_y = height / SEND_HEIGHT
                 x1 = int(x1 * scale_x)
                 y1 = int(y1 * scale_y)
                 x2 = int(x2 * scale_x)
@@ -208,11 +218,11 @@ class WindowClass(QMainWindow, from_class):
             pixmap = pixmap.scaled(self.label.width(), self.label.height(), Qt.KeepAspectRatio)
             self.label.setPixmap(pixmap)
 
-            resized = cv2.resize(cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR), (480, 360))
-            _, encoded_img = cv2.imencode('.jpg', resized, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
+            resized = cv2.resize(cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR), (SEND_WIDTH, SEND_HEIGHT))
+            _, encoded_img = cv2.imencode('.jpg', resized, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
             if encoded_img is not None:
                 try:
-                    self.sock.sendto(encoded_img.tobytes(), (self.udp_ip, self.udp_port))
+                    self.frame_sender.send(encoded_img.tobytes(), capture_ts)
                 except Exception as e:
                     print(f"[⚠️] UDP 전송 오류: {e}")
 
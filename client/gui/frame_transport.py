@@ -0,0 +1,34 @@
+import struct
+import time
+
+# ===============================
+# 청크 단위 UDP 프레임 전송 (송신측)
+# ※ deepcycle_ai_server/frame_transport.py 와 헤더 형식을 동일하게 유지할 것
+#   magic(2) "DC" | version(1) | flags(1) | source_id(2) | frame_seq(4)
+#   chunk_idx(2) | chunk_count(2) | chunk_size(2) | capture_ts(8, float 초)
+# ===============================
+MAGIC = b"DC"
+VERSION = 1
+HEADER = struct.Struct("!2sBBHIHHHd")
+
+# IP 단편화를 피하도록 이더넷 MTU(1500) - IP/UDP 헤더(28) 이하로 유지
+MAX_DATAGRAM = 1472
+CHUNK_PAYLOAD = MAX_DATAGRAM - HEADER.size
+
+
+class FrameSender:
+    def __init__(self, sock, addr, source_id=0):
+        self.sock = sock
+        self.addr = addr
+        self.source_id = source_id & 0xFFFF
+        self.frame_seq = 0
+
+    def send(self, data, capture_ts=None):
+        capture_ts = time.time() if capture_ts is None else capture_ts
+        view = memoryview(data)
+        chunk_count = max(1, -(-len(data) // CHUNK_PAYLOAD))
+        for idx in range(chunk_count):
+            header = HEADER.pack(MAGIC, VERSION, 0, self.source_id, self.frame_seq,
+                                 idx, chunk_count, CHUNK_PAYLOAD, capture_ts)
+            self.sock.sendto(header + view[idx * CHUNK_PAYLOAD:(idx + 1) * CHUNK_PAYLOAD], self.addr)
+        self.frame_seq = (self.frame_seq + 1) & 0xFFFFFFFF
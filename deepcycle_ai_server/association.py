@@ -0,0 +1,61 @@
+import numpy as np
+
+from utils import iou_matrix
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy 가 없으면 greedy 매칭으로 대체
+    linear_sum_assignment = None
+
+
+# ===============================
+# 감지 결과 ↔ 트래커 박스 매칭 (클래스 게이팅 + IOU)
+# ===============================
+def associate(det_boxes, det_class_ids, trk_boxes, trk_class_ids, iou_threshold=0.5, method="hungarian",
+              class_gating=True):
+    """
+    감지 박스와 트래커 박스를 1:1 로 매칭
+    :param method: "hungarian" (최적 매칭, scipy 필요) 또는 "greedy" (IOU 큰 순서대로)
+    :param class_gating: False 면 클래스가 달라도 매칭 (클래스는 트랙 단위 투표로 결정할 때)
+    :return: (matches [(det_idx, trk_idx), ...], unmatched_dets, unmatched_trks)
+    """
+    num_dets = len(det_boxes)
+    num_trks = len(trk_boxes)
+    if num_dets == 0 or num_trks == 0:
+        return [], list(range(num_dets)), list(range(num_trks))
+
+    ious = iou_matrix(det_boxes, trk_boxes)
+    if class_gating:
+        # 클래스가 다른 쌍은 매칭 후보에서 제외
+        same_class = np.asarray(det_class_ids)[:, None] == np.asarray(trk_class_ids)[None, :]
+        ious = np.where(same_class, ious, 0.0)
+
+    if method == "hungarian" and linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-ious)
+    else:
+        rows, cols = _greedy_assignment(ious, iou_threshold)
+
+    rows = np.asarray(rows, dtype=np.intp)
+    cols = np.asarray(cols, dtype=np.intp)
+    valid = ious[rows, cols] >= iou_threshold
+    matches = list(zip(rows[valid].tolist(), cols[valid].tolist()))
+
+    unmatched_dets = sorted(set(range(num_dets)) - set(rows[valid].tolist()))
+    unmatched_trks = sorted(set(range(num_trks)) - set(cols[valid].tolist()))
+    return matches, unmatched_dets, unmatched_trks
+
+
+def _greedy_assignment(ious, iou_threshold):
+    det_idx, trk_idx = np.nonzero(ious >= iou_threshold)
+    order = np.argsort(-ious[det_idx, trk_idx], kind="stable")
+
+    rows, cols = [], []
+    used_dets, used_trks = set(), set()
+    for d, t in zip(det_idx[order].tolist(), trk_idx[order].tolist()):
+        if d in used_dets or t in used_trks:
+            continue
+        used_dets.add(d)
+        used_trks.add(t)
+        rows.append(d)
+        cols.append(t)
+    return rows, cols
@@ -0,0 +1,72 @@
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from yolo_detector import YoloDetector
+
+# ===============================
+# 배치 크기별 추론 처리량(frames/s) 측정
+# 사용 예) python bench_batch_inference.py --model 12_model.pt --images ./samples --batch-sizes 1 2 4 8
+# ===============================
+
+
+def load_frames(image_dir, count):
+    paths = sorted(glob.glob(os.path.join(image_dir, "*.jpg")) + glob.glob(os.path.join(image_dir, "*.png")))
+    frames = [cv2.imread(p) for p in paths[:count]]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        raise FileNotFoundError(f"이미지를 찾을 수 없습니다: {image_dir}")
+    return frames
+
+
+def random_frames(count, width=480, height=360):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def bench(detector, frames, batch_size, repeat):
+    # 워밍업 (첫 호출의 그래프/메모리 할당 비용 제외)
+    detector.detect_batch(frames[:batch_size])
+
+    num_frames = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(frames) - batch_size + 1, batch_size):
+            batch = frames[i:i + batch_size]
+            if batch_size == 1:
+                detector.detect_all(batch[0])
+            else:
+                detector.detect_batch(batch)
+            num_frames += len(batch)
+    elapsed = time.perf_counter() - start
+    return num_frames / elapsed, elapsed / num_frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 마이크로 배치 처리량 벤치마크")
+    parser.add_argument("--model", required=True, help="YOLO 모델 경로 (.pt)")
+    parser.add_argument("--images", help="샘플 이미지 폴더 (없으면 480x360 랜덤 프레임 사용)")
+    parser.add_argument("--num-frames", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.num_frames) if args.images else random_frames(args.num_frames)
+    detector = YoloDetector(args.model)
+
+    print(f"frames={len(frames)}, repeat={args.repeat}")
+    print(f"{'batch':>6} | {'frames/s':>9} | {'ms/frame':>9}")
+    print("-" * 31)
+    for batch_size in args.batch_sizes:
+        if batch_size > len(frames):
+            continue
+        fps, ms_per_frame = bench(detector, frames, batch_size, args.repeat)
+        print(f"{batch_size:>6} | {fps:>9.1f} | {ms_per_frame:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from bench_batch_inference import load_frames, random_frames
+from contamination import HUE_BINS, hue_histograms, hue_spread
+
+# ===============================
+# 이물질 검사: 박스별 루프 (model_develop/opencv_test.py 방식) vs 한 번에 계산 (contamination.py)
+# single-pass: 덮는 영역 HSV 변환 한 번 + box_index * 180 + hue 키로 np.bincount 한 번 (비교용)
+# 사용 예) python bench_contamination.py --images ./samples --boxes 1 2 4 8 16
+# ===============================
+
+
+def spread_per_roi(frame, boxes):
+    # opencv_test.is_contaminated 의 통계량을 박스마다 따로 계산
+    values = []
+    for x1, y1, x2, y2 in boxes:
+        hsv = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv[:, :, 0]], [0], None, [180], [0, 180])
+        hist = cv2.normalize(hist, hist).flatten()
+        values.append(np.std(hist))
+    return np.array(values)
+
+
+def spread_vectorized(frame, boxes):
+    return hue_spread(hue_histograms(frame, boxes))
+
+
+def spread_single_pass(frame, boxes):
+    # 박스가 겹칠 수 있으므로 픽셀 라벨 맵 대신 박스 픽셀을 이어 붙여서 키 구성
+    x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+    x1, y1 = boxes[:, 2].max(), boxes[:, 3].max()
+    hue = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2HSV)[:, :, 0]
+    keys = np.concatenate([hue[by0 - y0:by1 - y0, bx0 - x0:bx1 - x0].ravel() + np.uint16(i * HUE_BINS)
+                           for i, (bx0, by0, bx1, by1) in enumerate(boxes.tolist())])
+    hists = np.bincount(keys, minlength=len(boxes) * HUE_BINS).reshape(len(boxes), HUE_BINS)
+    return hue_spread(hists.astype(np.float32))
+
+
+def random_boxes(rng, frame, count, min_size=40):
+    h, w = frame.shape[:2]
+    x1 = rng.integers(0, w - min_size, count)
+    y1 = rng.integers(0, h - min_size, count)
+    x2 = np.minimum(x1 + rng.integers(min_size, w // 2, count), w)
+    y2 = np.minimum(y1 + rng.integers(min_size, h // 2, count), h)
+    return np.stack([x1, y1, x2, y2], axis=1)
+
+
+def bench(fn, frames, boxes, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame, b in zip(frames, boxes):
+            fn(frame, b)
+    return (time.perf_counter() - start) / (repeat * len(frames)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이물질 검사 박스별 루프 vs 벡터화 비교")
+    parser.add_argument("--images", help="샘플 이미지 폴더 (없으면 480x360 랜덤 프레임 사용)")
+    parser.add_argument("--num-frames", type=int, default=32)
+    parser.add_argument("--boxes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.num_frames) if args.images else random_frames(args.num_frames)
+    rng = np.random.default_rng(0)
+
+    print(f"frames={len(frames)}, repeat={args.repeat}")
+    print(f"{'boxes':>5} | {'per-ROI us':>10} | {'vectorized us':>13} | {'speedup':>7} | "
+          f"{'single-pass us':>14} | {'speedup':>7} | {'max diff':>8}")
+    print("-" * 84)
+    for count in args.boxes:
+        boxes = [random_boxes(rng, frame, count) for frame in frames]
+        diff = max(max(np.abs(spread_per_roi(f, b) - spread_vectorized(f, b)).max(),
+                       np.abs(spread_per_roi(f, b) - spread_single_pass(f, b)).max()) for f, b in zip(frames, boxes))
+        loop_us = bench(spread_per_roi, frames, boxes, args.repeat)
+        vec_us = bench(spread_vectorized, frames, boxes, args.repeat)
+        single_us = bench(spread_single_pass, frames, boxes, args.repeat)
+        print(f"{count:>5} | {loop_us:>10.1f} | {vec_us:>13.1f} | {loop_us / vec_us:>7.2f} | "
+              f"{single_us:>14.1f} | {loop_us / single_us:>7.2f} | {diff:>8.1e}")
+
+
+if __name__ == "__main__":
+    main()
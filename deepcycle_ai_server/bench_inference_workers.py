@@ -0,0 +1,62 @@
+import argparse
+import os
+import time
+
+from bench_batch_inference import load_frames, random_frames
+from inference_workers import InferenceWorkerPool
+from yolo_detector import YoloDetector
+
+# ===============================
+# 추론 워커 프로세스 수(K)별 처리량 측정
+# 사용 예) python bench_inference_workers.py --model 12_model.pt --max-workers 8 --batch-per-worker 2
+# K=0 은 워커 없이 현재 프로세스에서 추론 (기준값)
+# ===============================
+
+
+def bench(detector, frames, batch_size, repeat):
+    detector.detect_batch(frames[:batch_size])
+
+    num_frames = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(frames) - batch_size + 1, batch_size):
+            num_frames += len(detector.detect_batch(frames[i:i + batch_size]))
+    return num_frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 워커 프로세스 스케일링 벤치마크")
+    parser.add_argument("--model", required=True, help="YOLO 모델 경로 (.pt)")
+    parser.add_argument("--images", help="샘플 이미지 폴더 (없으면 480x360 랜덤 프레임 사용)")
+    parser.add_argument("--num-frames", type=int, default=64)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-per-worker", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.num_frames) if args.images else random_frames(args.num_frames)
+    max_shape = tuple(max(f.shape[i] for f in frames) for i in range(3))
+
+    print(f"frames={len(frames)}, batch/worker={args.batch_per_worker}")
+    print(f"{'K':>3} | {'frames/s':>9} | {'speedup':>7}")
+    print("-" * 25)
+
+    detector = YoloDetector(args.model)
+    baseline = bench(detector, frames, args.batch_per_worker, args.repeat)
+    del detector
+    print(f"{0:>3} | {baseline:>9.1f} | {1.0:>7.2f}")
+
+    for k in range(1, args.max_workers + 1):
+        batch_size = k * args.batch_per_worker
+        if batch_size > len(frames):
+            break
+        pool = InferenceWorkerPool(args.model, k, max_frame_shape=max_shape)
+        try:
+            fps = bench(pool, frames, batch_size, args.repeat)
+        finally:
+            pool.close()
+        print(f"{k:>3} | {fps:>9.1f} | {fps / baseline:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
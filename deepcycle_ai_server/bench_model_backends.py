@@ -0,0 +1,108 @@
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+
+from association import associate
+from bench_batch_inference import load_frames
+from yolo_detector import YoloDetector
+
+# ===============================
+# 추론 백엔드 비교 (지연시간 / .pt 대비 정확도)
+# 사용 예)
+#   python bench_model_backends.py --model 12_model.pt --images ./val/images --labels ./val/labels \
+#       --calibration ./calib_images --configs torch onnx onnx-int8 openvino
+# --labels 가 있으면 YOLO 라벨 기준 precision / recall, 없으면 .pt 결과와의 일치율만 출력
+# ===============================
+
+
+def parse_config(config):
+    backend, _, suffix = config.partition("-")
+    return backend, suffix == "int8"
+
+
+def load_labels(label_dir, image_paths, frames):
+    labels = []
+    for path, frame in zip(image_paths, frames):
+        h, w = frame.shape[:2]
+        label_path = os.path.join(label_dir, os.path.splitext(os.path.basename(path))[0] + ".txt")
+        boxes, class_ids = [], []
+        if os.path.exists(label_path):
+            for line in open(label_path):
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                cls, cx, cy, bw, bh = int(parts[0]), *map(float, parts[1:5])
+                boxes.append([(cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h])
+                class_ids.append(cls)
+        labels.append((boxes, class_ids))
+    return labels
+
+
+def match_counts(predictions, references, conf_threshold, iou_threshold=0.5):
+    tp = fp = fn = 0
+    for dets, (ref_boxes, ref_class_ids) in zip(predictions, references):
+        dets = dets.filter(conf_threshold)
+        matches, unmatched_preds, unmatched_refs = associate(
+            dets.boxes, dets.class_ids, ref_boxes, ref_class_ids,
+            iou_threshold=iou_threshold, method="greedy"
+        )
+        tp += len(matches)
+        fp += len(unmatched_preds)
+        fn += len(unmatched_refs)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 추론 백엔드 비교 벤치마크")
+    parser.add_argument("--model", required=True, help="YOLO 모델 경로 (.pt)")
+    parser.add_argument("--images", required=True, help="평가 이미지 폴더")
+    parser.add_argument("--labels", help="YOLO 형식 라벨 폴더 (선택)")
+    parser.add_argument("--calibration", help="INT8 보정 데이터 (onnx: 이미지 폴더, openvino: 데이터셋 yaml)")
+    parser.add_argument("--configs", nargs="+", default=["torch", "onnx", "openvino"])
+    parser.add_argument("--num-frames", type=int, default=100)
+    parser.add_argument("--conf", type=float, default=0.5)
+    args = parser.parse_args()
+
+    image_paths = sorted(glob.glob(os.path.join(args.images, "*.jpg")) + glob.glob(os.path.join(args.images, "*.png")))
+    frames = load_frames(args.images, args.num_frames)
+    image_paths = image_paths[:len(frames)]
+    labels = load_labels(args.labels, image_paths, frames) if args.labels else None
+
+    reference = None
+    print(f"frames={len(frames)}")
+    print(f"{'config':>14} | {'ms/frame':>9} | {'p50 ms':>7} | {'p95 ms':>7} | {'vs .pt P/R':>11} | {'label P/R':>11}")
+    print("-" * 75)
+    for config in ["torch"] + [c for c in args.configs if c != "torch"]:
+        backend, int8 = parse_config(config)
+        try:
+            detector = YoloDetector(args.model, backend=backend, int8=int8, calibration_data=args.calibration)
+        except Exception as e:
+            print(f"{config:>14} | 사용 불가: {e}")
+            continue
+
+        detector.detect_all(frames[0])
+        latencies, predictions = [], []
+        for frame in frames:
+            start = time.perf_counter()
+            predictions.append(detector.detect_all(frame))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        if reference is None:
+            # .pt 결과(conf 기준 이상)를 기준으로 삼음
+            reference = [(d.boxes, d.class_ids) for d in (p.filter(args.conf) for p in predictions)]
+        p_ref, r_ref = match_counts(predictions, reference, args.conf)
+        label_pr = "-"
+        if labels is not None:
+            p_lab, r_lab = match_counts(predictions, labels, args.conf)
+            label_pr = f"{p_lab:.3f}/{r_lab:.3f}"
+        print(f"{config:>14} | {np.mean(latencies):>9.1f} | {np.percentile(latencies, 50):>7.1f} | "
+              f"{np.percentile(latencies, 95):>7.1f} | {p_ref:.3f}/{r_ref:.3f} | {label_pr:>11}")
+
+
+if __name__ == "__main__":
+    main()
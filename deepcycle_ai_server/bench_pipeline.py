@@ -0,0 +1,174 @@
+import argparse
+import json
+import time
+
+import server
+from stream_recorder import count_frames, read_recording, replay
+from yolo_detector import Detections
+
+# ===============================
+# 녹화한 프레임 스트림으로 AI 서버 파이프라인 전체 (수신 → 디코딩 → 감지 → 추적 → 결과) 벤치마크
+# 사용 예)
+#   python bench_pipeline.py line1.dcr --stub --stub-latency-ms 40 --speed 0
+#   python bench_pipeline.py line1.dcr --model 12_model.pt --speed 1 --json result.json
+# --stub: 모델 없이 고정된 가짜 감지 (파이프라인 변경 회귀 테스트용)
+# DB 업로드는 하지 않고, UI 알림은 127.0.0.1 로 보냄
+# 끝나면 열린 투표 윈도우를 바로 결정 → result 단계 = 수신 → 결과 지연
+# ===============================
+
+
+class StubDetector:
+    def __init__(self, class_id=3, conf=0.9, latency=0.02):
+        """
+        :param latency: 프레임당 추론 시간 흉내 (초)
+        """
+        self.class_id = class_id
+        self.conf = conf
+        self.latency = latency
+
+    def _fake(self, frame):
+        # 프레임 가운데 고정 박스 하나
+        h, w = frame.shape[:2]
+        return Detections.from_array([[w * 0.3, h * 0.3, w * 0.7, h * 0.7, self.conf, self.class_id]], frame)
+
+    def detect_all(self, frame, roi=None):
+        time.sleep(self.latency)
+        return self._fake(frame)
+
+    def detect_batch(self, frames, rois=None):
+        time.sleep(self.latency * len(frames))
+        return [self._fake(frame) for frame in frames]
+
+
+def wait_drained(settle=1.0, timeout=30.0):
+    """
+    큐가 비고 처리 수가 settle 초 동안 그대로면 끝난 것으로 봄
+    :return: 마지막으로 처리 수가 늘어난 시각
+    """
+    deadline = time.time() + timeout
+    last = None
+    last_change = time.time()
+    while time.time() < deadline:
+        snapshot = server.metrics.snapshot()
+        processed = snapshot["latency_ms"].get("pipeline", {}).get("count", 0)
+        if processed != last:
+            last, last_change = processed, time.time()
+        if snapshot["gauges"].get("frame_queue_depth", 0) == 0 and time.time() - last_change >= settle:
+            break
+        time.sleep(0.1)
+    return last_change
+
+
+def wait_results_sent(timeout=5.0):
+    deadline = time.time() + timeout
+    while not server.result_queue.empty() and time.time() < deadline:
+        time.sleep(0.05)
+    # 큐에서 꺼낸 마지막 결과의 알림까지
+    time.sleep(0.2)
+
+
+def summarize(snapshot, sent_frames, wall):
+    latency = snapshot["latency_ms"]
+    counters = snapshot["counters"]
+    gauges = snapshot["gauges"]
+    processed = latency.get("pipeline", {}).get("count", 0)
+    gated = counters.get("frames_gated", 0)
+    return {
+        "frames_sent": sent_frames,
+        "frames_received": counters.get("frames_received", 0),
+        "frames_processed": processed,
+        "frames_gated": gated,
+        "fps": processed / wall if wall else 0.0,
+        "drop_rate": 1 - (processed + gated) / sent_frames if sent_frames else 0.0,
+        "drops": {
+            "incomplete": gauges.get("frames_incomplete_total", 0),
+            "missing": gauges.get("frames_missing_total", 0),
+            "overwritten": gauges.get("frames_overwritten_total", 0),
+            "expired": gauges.get("frames_expired_total", 0),
+            "decode_failures": counters.get("decode_failures", 0),
+        },
+        "results": counters.get("results_notified", 0),
+        # result: 결과로 뽑힌 프레임 수신 → 결과 결정, decision: 객체 첫 투표 → 결과 결정
+        "latency_ms": {
+            stage: {k: h[k] for k in ("count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms") if k in h}
+            for stage, h in latency.items()
+        },
+    }
+
+
+def print_summary(summary, wall):
+    print(f"프레임: 전송 {summary['frames_sent']}, 수신 {summary['frames_received']}, "
+          f"처리 {summary['frames_processed']}, 움직임 게이트 {summary['frames_gated']} ({wall:.1f} s)")
+    print(f"처리량: {summary['fps']:.1f} fps | 드롭률 {summary['drop_rate']:.1%} "
+          + ", ".join(f"{k} {v}" for k, v in summary["drops"].items()))
+    print(f"결과: {summary['results']}건")
+    print(f"{'stage':>13} | {'count':>6} | {'mean':>7} | {'p50':>6} | {'p95':>6} | {'p99':>6} | {'max':>7}  (ms)")
+    print("-" * 73)
+    for stage, h in summary["latency_ms"].items():
+        if not h.get("count"):
+            continue
+        print(f"{stage:>13} | {h['count']:>6} | {h['mean_ms']:>7.1f} | {h['p50_ms']:>6.1f} | {h['p95_ms']:>6.1f} | "
+              f"{h['p99_ms']:>6.1f} | {h['max_ms']:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 스트림 재생 기반 파이프라인 벤치마크")
+    parser.add_argument("recording", help="stream_recorder.py 로 만든 녹화 파일")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = 원래 속도, 0 = 최대 속도")
+    parser.add_argument("--model", help="YOLO 모델 경로 (지정하면 server.MODEL_PATH 대신 사용)")
+    parser.add_argument("--stub", action="store_true", help="모델 대신 고정된 가짜 감지 사용")
+    parser.add_argument("--stub-latency-ms", type=float, default=20)
+    parser.add_argument("--tracker", help="트래커 백엔드 (KCF / CSRT / MOSSE / KALMAN, 기본은 server.TRACKER_BACKEND)")
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--json", help="요약을 JSON 으로 저장 (변경 전후 비교용)")
+    args = parser.parse_args()
+
+    packets = read_recording(args.recording)
+    sent_frames = count_frames(packets)
+
+    server.UPLOAD_RESULTS = False
+    server.SOURCE_ROUTES = {}
+    if args.tracker:
+        server.TRACKER_BACKEND = args.tracker
+    if args.stub:
+        server.detector = StubDetector(latency=args.stub_latency_ms / 1000)
+        server.detector_ready.set()
+    else:
+        if args.model:
+            server.MODEL_PATH = args.model
+        # 로드 + 워밍업까지 끝낸 뒤 측정 (첫 추론 초기화 / 변환이 섞이지 않도록)
+        server.load_detector()
+        if not server.detector_ready.is_set():
+            return
+
+    receiver = server.FrameReceiverThread()
+    server.metrics.add_collector(server.collect_pipeline_metrics)
+    server.metrics.add_collector(receiver.collect_metrics)
+    inference = server.InferenceThread()
+    threads = [receiver, inference, server.ResultSenderThread()]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    time.sleep(0.5)
+
+    print(f"[▶] {args.recording}: 프레임 {sent_frames}장, 데이터그램 {len(packets)}개, speed={args.speed}")
+    start = time.time()
+    replay(packets, ("127.0.0.1", server.RECEIVER_PORT), args.speed)
+    wall = wait_drained(timeout=args.drain_timeout) - start
+    # 재생이 투표 윈도우보다 짧아도 결과 지연이 잡히도록 열린 윈도우를 바로 결정하고 전송까지 대기
+    inference.flush_votes()
+    wait_results_sent()
+
+    server.shutdown_event.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    summary = summarize(server.metrics.snapshot(), sent_frames, wall)
+    print_summary(summary, wall)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
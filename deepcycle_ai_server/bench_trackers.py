@@ -0,0 +1,163 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from association import associate
+from tracker_backends import TRACKER_BACKENDS, create_tracker_backend
+
+# ===============================
+# 트래커 백엔드 비교 벤치마크 (tracks/s, ID switch 비율)
+# 사용 예)
+#   python bench_trackers.py --video recorded.mp4 --model 12_model.pt --backends KCF CSRT KALMAN
+#   python bench_trackers.py --synthetic --backends KCF KALMAN
+# 녹화 영상은 YOLO 감지를 한 번만 수행하고 모든 백엔드에 같은 감지 결과를 사용
+# ===============================
+
+
+def load_video_stream(video_path, model_path, conf_threshold):
+    from yolo_detector import YoloDetector
+
+    detector = YoloDetector(model_path)
+    cap = cv2.VideoCapture(video_path)
+    frames, detections = [], []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        dets = detector.detect_all(frame).filter(conf_threshold)
+        frames.append(frame)
+        # 녹화 영상은 정답 ID 가 없으므로 None (연속 프레임 IOU 체인을 기준으로 사용)
+        detections.append((dets.boxes.tolist(), dets.class_ids.tolist(), None))
+    cap.release()
+    return frames, detections
+
+
+def synthetic_stream(num_frames=300, num_objects=6, width=480, height=360, seed=0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 0], [width - 60, height - 60], (num_objects, 2))
+    vel = rng.uniform(-4, 4, (num_objects, 2))
+    size = rng.uniform(30, 60, (num_objects, 2))
+    class_ids = rng.integers(0, 12, num_objects).tolist()
+
+    frames, detections = [], []
+    for _ in range(num_frames):
+        pos += vel
+        bounce = (pos < 0) | (pos + size > [width, height])
+        vel[bounce] *= -1
+        pos = np.clip(pos, 0, [width, height] - size)
+
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        boxes = []
+        for i in range(num_objects):
+            x1, y1 = pos[i]
+            x2, y2 = pos[i] + size[i]
+            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (60 + 15 * i, 200, 255 - 20 * i), -1)
+            # 감지 결과에 약간의 노이즈 추가
+            boxes.append((np.array([x1, y1, x2, y2]) + rng.normal(0, 1.5, 4)).tolist())
+        frames.append(frame)
+        detections.append((boxes, class_ids, list(range(num_objects))))
+    return frames, detections
+
+
+def reference_ids(detections, iou_threshold=0.5):
+    # 정답 ID 가 없는 녹화 영상: 연속 프레임 감지를 IOU 로 이어 붙여 기준 ID 생성
+    ref, prev_boxes, prev_classes, prev_ids, next_id = [], [], [], [], 0
+    for boxes, class_ids, gt_ids in detections:
+        if gt_ids is not None:
+            ref.append(gt_ids)
+            continue
+        ids = [None] * len(boxes)
+        matches, _, _ = associate(boxes, class_ids, prev_boxes, prev_classes, iou_threshold, method="greedy")
+        for d, p in matches:
+            ids[d] = prev_ids[p]
+        for d in range(len(boxes)):
+            if ids[d] is None:
+                ids[d] = next_id
+                next_id += 1
+        ref.append(ids)
+        prev_boxes, prev_classes, prev_ids = boxes, class_ids, ids
+    return ref
+
+
+def run_backend(name, frames, detections, ref_ids, iou_threshold=0.5, max_age=30):
+    tracks = create_tracker_backend(name)
+    meta = {}                # track_id → (class_id, last_seen_frame)
+    assigned = {}            # ref_id → 마지막으로 배정된 track_id
+    next_track_id = 0
+    track_steps = 0
+    id_switches = 0
+    matched_total = 0
+    elapsed = 0.0
+
+    for frame_idx, (frame, (boxes, class_ids, _), ref) in enumerate(zip(frames, detections, ref_ids)):
+        start = time.perf_counter()
+        track_ids, track_boxes = tracks.predict(frame)
+        track_steps += len(tracks)
+        track_class_ids = [meta[t][0] for t in track_ids]
+        matches, unmatched_dets, _ = associate(boxes, class_ids, track_boxes, track_class_ids, iou_threshold)
+        tracks.correct([track_ids[t] for _, t in matches], [boxes[d] for d, _ in matches])
+
+        det_track = {}
+        for d, t in matches:
+            det_track[d] = track_ids[t]
+            meta[track_ids[t]] = (class_ids[d], frame_idx)
+        for d in unmatched_dets:
+            tracks.add(next_track_id, frame, boxes[d])
+            meta[next_track_id] = (class_ids[d], frame_idx)
+            det_track[d] = next_track_id
+            next_track_id += 1
+        for track_id in [t for t, (_, last) in meta.items() if frame_idx - last > max_age]:
+            del meta[track_id]
+            tracks.remove(track_id)
+        elapsed += time.perf_counter() - start
+
+        for d, ref_id in enumerate(ref):
+            if ref_id in assigned:
+                matched_total += 1
+                if assigned[ref_id] != det_track[d]:
+                    id_switches += 1
+            assigned[ref_id] = det_track[d]
+
+    return {
+        "tracks_per_sec": track_steps / elapsed if elapsed else 0,
+        "ms_per_frame": elapsed / len(frames) * 1000,
+        "id_switch_rate": id_switches / matched_total if matched_total else 0,
+        "id_switches": id_switches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="트래커 백엔드 비교 벤치마크")
+    parser.add_argument("--video", help="녹화 영상 경로")
+    parser.add_argument("--model", help="YOLO 모델 경로 (--video 사용 시 필요)")
+    parser.add_argument("--synthetic", action="store_true", help="합성 영상 사용 (정답 ID 포함)")
+    parser.add_argument("--backends", nargs="+", default=sorted(TRACKER_BACKENDS))
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--iou", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.video:
+        if not args.model:
+            parser.error("--video 사용 시 --model 이 필요합니다")
+        frames, detections = load_video_stream(args.video, args.model, args.conf)
+    else:
+        frames, detections = synthetic_stream()
+    ref_ids = reference_ids(detections, args.iou)
+
+    print(f"frames={len(frames)}, detections={sum(len(d[0]) for d in detections)}")
+    print(f"{'backend':>8} | {'tracks/s':>10} | {'ms/frame':>9} | {'ID switch':>9} | {'rate':>6}")
+    print("-" * 55)
+    for name in args.backends:
+        try:
+            r = run_backend(name, frames, detections, ref_ids, args.iou)
+        except AttributeError as e:
+            print(f"{name:>8} | 사용 불가: {e}")
+            continue
+        print(f"{name:>8} | {r['tracks_per_sec']:>10.0f} | {r['ms_per_frame']:>9.2f} | "
+              f"{r['id_switches']:>9d} | {r['id_switch_rate']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import base64
+import time
+
+import numpy as np
+import requests
+
+# ===============================
+# 업로드 방식별 요청 크기 / 서버 CPU 비교 (Base64 JSON /upload vs 바이너리 /uploadBinary)
+# 사용 예) python bench_upload.py --server http://192.168.0.56:5000 --image sample.jpg --repeat 20
+# 서버 CPU 는 DB 서버가 응답 헤더(X-Upload-Cpu-Ms)로 알려주는 요청 처리 스레드의 CPU 시간
+# ※ 실제로 이미지가 저장되고 DB 에 기록되므로 테스트용 센터 id 로 실행
+# ===============================
+
+
+def build_request(server, image, fmt, center_id):
+    metadata = {"deepcycle_center_id": center_id, "extension": "jpg", "confidence": 0.9, "class": 6}
+    if fmt == "binary":
+        metadata["box"] = "0,0,10,10"
+        return requests.Request("POST", f"{server}/uploadBinary", params=metadata, data=image,
+                                headers={"Content-Type": "image/jpeg"}).prepare()
+    metadata["box"] = [0, 0, 10, 10]
+    metadata["image"] = base64.b64encode(image).decode("utf-8")
+    return requests.Request("POST", f"{server}/upload", json=metadata).prepare()
+
+
+def bench(session, server, image, fmt, center_id, repeat):
+    sizes, cpu_ms, round_trips = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        prepared = build_request(server, image, fmt, center_id)
+        response = session.send(prepared, timeout=10)
+        round_trips.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        sizes.append(len(prepared.body))
+        if "X-Upload-Cpu-Ms" in response.headers:
+            cpu_ms.append(float(response.headers["X-Upload-Cpu-Ms"]))
+    return np.mean(sizes), np.mean(cpu_ms) if cpu_ms else float("nan"), np.median(round_trips)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업로드 방식별 요청 크기 / 서버 CPU 벤치마크")
+    parser.add_argument("--server", required=True, help="DB 서버 주소 (예: http://127.0.0.1:5000)")
+    parser.add_argument("--image", required=True, help="업로드할 JPEG 파일")
+    parser.add_argument("--center-id", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        image = f.read()
+
+    print(f"image={len(image)} bytes, repeat={args.repeat}")
+    print(f"{'format':>7} | {'request bytes':>13} | {'server CPU ms':>13} | {'round trip ms':>13}")
+    print("-" * 56)
+    with requests.Session() as session:
+        for fmt in ("json", "binary"):
+            size, cpu, rtt = bench(session, args.server.rstrip("/"), image, fmt, args.center_id, args.repeat)
+            print(f"{fmt:>7} | {size:>13.0f} | {cpu:>13.2f} | {rtt:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
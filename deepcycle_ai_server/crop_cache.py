@@ -0,0 +1,121 @@
+import collections
+
+import cv2
+import numpy as np
+
+
+# ===============================
+# dHash: 크롭을 (hash_size+1) x hash_size 흑백으로 줄이고 가로 방향 밝기 변화를 비트로
+# ===============================
+def dhash(crop, hash_size=8):
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# ===============================
+# 크롭 단위 결과 캐시 (LRU + TTL)
+# key = (박스 위치/크기를 grid 단위로 양자화, dHash)
+# 같은 자리에 거의 같은 모양의 크롭이면 (해밍 거리 <= max_distance) 저장된 class / conf 반환
+# ===============================
+class CropCache:
+    def __init__(self, max_size=256, ttl=2.0, max_distance=4, grid=32):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.grid = grid
+        self.entries = collections.OrderedDict()   # (geo, hash) → (class_id, conf, inserted)
+        self.by_geo = {}                           # geo → {hash, ...}
+
+        # 로그 구간 통계 (reset_stats 로 초기화)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_time = 0.0
+        # 메트릭용 누적값 (초기화하지 않음)
+        self.cumulative_hits = 0
+        self.cumulative_misses = 0
+        self.cumulative_evictions = 0
+        self.cumulative_saved_time = 0.0
+
+    def _geo(self, box):
+        x1, y1, x2, y2 = (int(v) // self.grid for v in box)
+        return x1, y1, x2, y2
+
+    @staticmethod
+    def crop(frame, box):
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = (int(v) for v in box)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, w), min(y2, h)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return None
+        return frame[y1:y2, x1:x2]
+
+    def _remove(self, key):
+        del self.entries[key]
+        geo, h = key
+        hashes = self.by_geo.get(geo)
+        if hashes is not None:
+            hashes.discard(h)
+            if not hashes:
+                del self.by_geo[geo]
+
+    def lookup(self, frame, box, now):
+        """
+        :return: (class_id, conf) 또는 None
+        """
+        crop = self.crop(frame, box)
+        if crop is not None:
+            geo = self._geo(box)
+            h = dhash(crop)
+            for cached in list(self.by_geo.get(geo, ())):
+                if hamming(cached, h) > self.max_distance:
+                    continue
+                key = (geo, cached)
+                class_id, conf, inserted = self.entries[key]
+                if now - inserted > self.ttl:
+                    self._remove(key)
+                    continue
+                self.entries.move_to_end(key)
+                self.hits += 1
+                self.cumulative_hits += 1
+                return class_id, conf
+        self.misses += 1
+        self.cumulative_misses += 1
+        return None
+
+    def put(self, frame, box, class_id, conf, now):
+        crop = self.crop(frame, box)
+        if crop is None:
+            return
+        key = (self._geo(box), dhash(crop))
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        self.entries[key] = (class_id, conf, now)
+        self.by_geo.setdefault(key[0], set()).add(key[1])
+        while len(self.entries) > self.max_size:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+            self.cumulative_evictions += 1
+
+    def record_saved(self, seconds):
+        # 캐시 적중으로 생략한 추론 시간
+        self.saved_time += seconds
+        self.cumulative_saved_time += seconds
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_time = 0.0
@@ -0,0 +1,250 @@
+import atexit
+import collections
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from crop_cache import dhash, hamming
+from utils import crop_roi
+from yolo_detector import CLASS_NAMES
+
+# 프레임 중복 판단용 dHash 크기 (16 → 256비트, 컨베이어 위 작은 물체 차이도 반영되도록 크롭 캐시보다 크게)
+FRAME_HASH_SIZE = 16
+
+
+# ===============================
+# 재학습 데이터 내보내기 (YOLO 형식)
+# - 박스를 그리지 않은 원본 프레임 + 라벨 txt (class x_center y_center width height, 0~1 정규화)
+# - out_dir/shard_00000/{images,labels}/ ... 샤드마다 shard_max_bytes / shard_max_images 까지만
+#   (샤드 디렉터리는 model_develop/for_train_config.yaml 의 train / val 경로로 바로 사용 가능)
+# - ROI 가 있는 소스는 ROI 크롭만 저장 (ROI 밖 물체는 감지하지 않으므로 전체 프레임이면 라벨이 빠짐)
+# - 같은 소스의 최근 프레임과 거의 같으면 (dHash 해밍 거리 <= dedup_distance, 클래스 구성 동일) 건너뜀
+# - 추론 스레드는 submit() 으로 참조만 넘기고, 해시 / 인코딩 / 파일 쓰기는 우선순위를 낮춘 스레드 하나가
+#   batch_size 개씩 모아서 처리 (대기 큐가 가득 차면 버림 - 실시간 추론이 우선)
+# ===============================
+class DatasetExporter:
+    def __init__(self, out_dir, shard_max_bytes=256 << 20, shard_max_images=2000, max_shards=None,
+                 batch_size=16, flush_interval=5.0, dedup_distance=8, dedup_window=64, min_conf=0.5,
+                 max_pending=16, jpeg_quality=95, metrics=None):
+        """
+        :param max_shards: 이 수만큼 샤드를 채우면 내보내기 중단 (None 이면 제한 없음)
+        :param min_conf: 이보다 conf 가 낮은 감지가 하나라도 있는 프레임은 라벨이 불확실하므로 건너뜀
+        :param jpeg_quality: 원본 JPEG 가 없는 프레임만 이 품질로 인코딩
+        :param metrics: Metrics (있으면 배치 쓰기 시간을 export 단계로 기록)
+        """
+        self.out_dir = out_dir
+        self.shard_max_bytes = shard_max_bytes
+        self.shard_max_images = shard_max_images
+        self.max_shards = max_shards
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_distance = dedup_distance
+        self.dedup_window = dedup_window
+        self.min_conf = min_conf
+        self.jpeg_quality = jpeg_quality
+        self.metrics = metrics
+
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.recent = {}            # source_key → deque[(hash, class_ids)]
+        self.stop_event = threading.Event()
+
+        # 이전 실행의 샤드는 건드리지 않고 다음 번호부터 새로 시작
+        os.makedirs(out_dir, exist_ok=True)
+        self.shards = sorted(d for d in os.listdir(out_dir) if d.startswith("shard_"))
+        self.shard_index = int(self.shards[-1][len("shard_"):]) + 1 if self.shards else 0
+        self.shard_dir = None
+        self.shard_bytes = 0
+        self.shard_images = 0
+        self.seq = 0
+
+        self.exported = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.bytes_written = 0
+        self.full = False
+
+        self.thread = threading.Thread(target=self._worker, name="DatasetExporter", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, frame, dets, source_key=("", 0), roi=None):
+        """
+        :param dets: 프레임 전체 좌표 Detections (모델 클래스 기준, conf 로 거르기 전 detector 출력 그대로)
+        :param source_key: 세션 키 (client_ip, source_id) - 이전 방식 클라이언트는 모두 source_id 0 이라 IP 까지 구분
+        :param roi: 세션 ROI (x1, y1, x2, y2) - 있으면 이 영역만 잘라서 저장
+        """
+        if self.full:
+            return
+        try:
+            self.pending.put_nowait((frame, dets.boxes, dets.class_ids, dets.confs, source_key, roi, time.time()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _lower_priority(self):
+        # 리눅스는 스레드마다 nice 값을 따로 가짐 (이 스레드만 낮춤)
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+    def _is_duplicate(self, frame_hash, class_ids, source_key):
+        recent = self.recent.setdefault(source_key, collections.deque(maxlen=self.dedup_window))
+        for h, ids in recent:
+            if ids == class_ids and hamming(h, frame_hash) <= self.dedup_distance:
+                return True
+        recent.append((frame_hash, class_ids))
+        return False
+
+    @staticmethod
+    def label_text(boxes, class_ids, width, height):
+        # [x1, y1, x2, y2] 픽셀 → YOLO 정규화 좌표 (학습 설정의 12 클래스만)
+        keep = class_ids < len(CLASS_NAMES)
+        boxes = boxes[keep].astype(np.float64)
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width) / width
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height) / height
+        xywh = np.column_stack([
+            (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2,
+            boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]
+        ])
+        return "".join(f"{c} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n" for c, (x, y, w, h) in zip(class_ids[keep], xywh))
+
+    def _prepare(self, item):
+        """
+        :return: (이름, JPEG 바이트, 라벨 텍스트, manifest 항목) 또는 None (건너뜀)
+        """
+        frame, boxes, class_ids, confs, source_key, roi, timestamp = item
+        if len(confs) and confs.min() < self.min_conf:
+            self.skipped += 1
+            return None
+        if roi is not None:
+            # 크롭은 원본 JPEG 가 없는 뷰라 아래에서 다시 인코딩
+            frame, (dx, dy) = crop_roi(frame, roi)
+            boxes = boxes - np.array([dx, dy, dx, dy], dtype=boxes.dtype)
+        if self._is_duplicate(dhash(frame, FRAME_HASH_SIZE), tuple(sorted(class_ids.tolist())), source_key):
+            self.duplicates += 1
+            return None
+
+        jpeg = getattr(frame, "jpeg", None)
+        if jpeg is None:
+            ret, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ret:
+                return None
+            jpeg = buffer.tobytes()
+        height, width = frame.shape[:2]
+        self.seq += 1
+        client_ip, source_id = source_key
+        name = f"{client_ip.replace('.', '-').replace(':', '-')}_src{source_id}_{int(timestamp * 1000)}_{self.seq:06d}"
+        entry = {"name": name, "client_ip": client_ip, "source_id": source_id, "timestamp": timestamp,
+                 "roi": list(roi) if roi is not None else None,
+                 "classes": class_ids.tolist(), "confs": [round(float(c), 3) for c in confs]}
+        return name, jpeg, self.label_text(boxes, class_ids, width, height), entry
+
+    def _open_shard(self):
+        if self.max_shards is not None and len(self.shards) >= self.max_shards:
+            self.full = True
+            print(f"[⚠️] 학습 데이터 샤드 {self.max_shards}개를 모두 채워 내보내기 중단 ({self.out_dir})")
+            return False
+        name = f"shard_{self.shard_index:05d}"
+        self.shard_dir = os.path.join(self.out_dir, name)
+        os.makedirs(os.path.join(self.shard_dir, "images"), exist_ok=True)
+        os.makedirs(os.path.join(self.shard_dir, "labels"), exist_ok=True)
+        self.shards.append(name)
+        self.shard_index += 1
+        self.shard_bytes = 0
+        self.shard_images = 0
+        self._write_dataset_yaml()
+        return True
+
+    def _write_dataset_yaml(self):
+        # for_train_config.yaml 과 같은 클래스 정의, train 에 지금까지의 샤드 목록
+        path = os.path.join(self.out_dir, "dataset.yaml")
+        with open(path + ".tmp", "w") as f:
+            f.write(f"path: {os.path.abspath(self.out_dir)}\n")
+            f.write("train:\n" + "".join(f"  - {name}\n" for name in self.shards))
+            f.write(f"nc: {len(CLASS_NAMES)}\n")
+            f.write(f"names: {[str(i) for i in range(len(CLASS_NAMES))]}\n")
+        os.replace(path + ".tmp", path)
+
+    def _write_batch(self, batch):
+        # 샤드별로 이미지 / 라벨을 몰아서 쓰고 manifest 는 샤드당 한 번만 추가
+        start = time.perf_counter()
+        manifest = []
+        for name, jpeg, label, entry in batch:
+            if self.shard_dir is None or self.shard_bytes + len(jpeg) > self.shard_max_bytes \
+                    or self.shard_images >= self.shard_max_images:
+                self._flush_manifest(manifest)
+                if not self._open_shard():
+                    break
+            with open(os.path.join(self.shard_dir, "images", name + ".jpg"), "wb") as f:
+                f.write(jpeg)
+            with open(os.path.join(self.shard_dir, "labels", name + ".txt"), "w") as f:
+                f.write(label)
+            size = len(jpeg) + len(label)
+            self.shard_bytes += size
+            self.shard_images += 1
+            self.bytes_written += size
+            self.exported += 1
+            manifest.append(entry)
+        self._flush_manifest(manifest)
+        if self.metrics is not None:
+            self.metrics.observe("export", time.perf_counter() - start)
+
+    def _flush_manifest(self, manifest):
+        if not manifest or self.shard_dir is None:
+            return
+        with open(os.path.join(self.shard_dir, "manifest.jsonl"), "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in manifest))
+        manifest.clear()
+
+    def _worker(self):
+        self._lower_priority()
+        batch = []
+        first = None
+        while not (self.stop_event.is_set() and self.pending.empty()):
+            try:
+                item = self.pending.get(timeout=0.5)
+            except queue.Empty:
+                item = None
+            if item is not None:
+                try:
+                    prepared = self._prepare(item)
+                except Exception as e:
+                    print(f"[⚠️] 학습 데이터 준비 실패: {e}")
+                    prepared = None
+                if prepared is not None:
+                    batch.append(prepared)
+                    first = first or time.time()
+            if batch and (len(batch) >= self.batch_size or time.time() - first >= self.flush_interval
+                          or self.stop_event.is_set()):
+                self._write_safely(batch)
+                batch, first = [], None
+        self._write_safely(batch)
+
+    def _write_safely(self, batch):
+        if not batch:
+            return
+        try:
+            self._write_batch(batch)
+        except OSError as e:
+            print(f"[⚠️] 학습 데이터 기록 실패: {e}")
+
+    def stats(self):
+        return {
+            "exported": self.exported,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "bytes_written": self.bytes_written,
+            "shards": len(self.shards),
+        }
+
+    def close(self, timeout=5.0):
+        # 남은 배치까지 기록하고 종료
+        self.stop_event.set()
+        self.thread.join(timeout)
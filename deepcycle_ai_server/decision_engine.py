@@ -0,0 +1,112 @@
+import collections
+import math
+
+from utils import iou
+
+
+class TrackVotes:
+    __slots__ = ("first_seen", "counts", "conf_sums", "evidence", "best", "decided",
+                 "decided_class", "last_box", "last_seen")
+
+    def __init__(self, first_seen):
+        self.first_seen = first_seen
+        self.counts = {}
+        self.conf_sums = {}
+        self.evidence = {}      # class_id → log-odds 누적합
+        self.best = {}          # class_id → (conf, box, frame, 프레임 수신 시각)
+        self.decided = False
+        # 결정 후 마지막으로 본 위치 (쿨다운 비교용)
+        self.decided_class = None
+        self.last_box = None
+        self.last_seen = first_seen
+
+    def leader(self):
+        return max(self.counts, key=lambda c: (self.counts[c], self.conf_sums[c])) if self.counts else None
+
+
+# ===============================
+# 트랙 단위 조기 결정 엔진
+# 트랙마다 감지 투표를 누적하고, 충분히 확신할 수 있으면 윈도우를 기다리지 않고 바로 결정
+# - 선두 클래스 투표 수 >= min_votes
+# - 선두 클래스 비율 >= min_share, 평균 conf >= min_conf
+# - 순차 검정: 선두 클래스 log-odds 누적 - 나머지 클래스 중 최대 >= min_evidence
+# 이미 결정된 트랙은 다시 결정하지 않음 (같은 객체 중복 전송 방지)
+# 트래커 유실로 같은 물체가 새 트랙이 되는 경우도 막기 위해, 결정된 트랙을 마지막으로 본 뒤
+# cooldown 초 안에 같은 클래스 / IoU >= cooldown_iou 위치에서 결정되는 새 트랙은 전송하지 않음
+# ===============================
+class DecisionEngine:
+    def __init__(self, min_votes=3, min_conf=0.6, min_share=0.7, min_evidence=3.0, cooldown=2.0, cooldown_iou=0.3):
+        self.min_votes = min_votes
+        self.min_conf = min_conf
+        self.min_share = min_share
+        self.min_evidence = min_evidence
+        self.cooldown = cooldown
+        self.cooldown_iou = cooldown_iou
+        self.tracks = {}
+        # 제거된 결정 트랙 (class_id, 마지막 박스, 마지막으로 본 시각)
+        self.recent = collections.deque()
+        self.suppressed = 0
+
+    def leader(self, track_id):
+        state = self.tracks.get(track_id)
+        return state.leader() if state else None
+
+    def vote(self, track_id, class_id, conf, box, frame, now, recv_time=None):
+        """
+        트랙에 감지 1건 투표
+        :param recv_time: frame 의 수신 시각 (결정 결과와 함께 돌려줌)
+        :return: 결정되면 (class_id, conf, box, frame, latency, recv_time), 아니면 None
+        """
+        state = self.tracks.get(track_id)
+        if state is None:
+            state = self.tracks[track_id] = TrackVotes(now)
+        if state.decided:
+            state.last_box = box
+            state.last_seen = now
+            return None
+
+        conf = min(max(float(conf), 1e-4), 1 - 1e-4)
+        state.counts[class_id] = state.counts.get(class_id, 0) + 1
+        state.conf_sums[class_id] = state.conf_sums.get(class_id, 0.0) + conf
+        state.evidence[class_id] = state.evidence.get(class_id, 0.0) + math.log(conf / (1 - conf))
+        if conf > state.best.get(class_id, (0.0,))[0]:
+            state.best[class_id] = (conf, box, frame, recv_time)
+
+        leader = state.leader()
+        count = state.counts[leader]
+        total = sum(state.counts.values())
+        others = max([e for c, e in state.evidence.items() if c != leader], default=0.0)
+        if (count >= self.min_votes
+                and count / total >= self.min_share
+                and state.conf_sums[leader] / count >= self.min_conf
+                and state.evidence[leader] - max(others, 0.0) >= self.min_evidence):
+            state.decided = True
+            state.decided_class = leader
+            state.last_box = box
+            state.last_seen = now
+            best_conf, best_box, best_frame, best_recv_time = state.best[leader]
+            # 결정 후에는 프레임 참조를 놓아 메모리 해제
+            state.best = {}
+            if self.recently_decided(track_id, leader, box, now):
+                self.suppressed += 1
+                return None
+            return leader, best_conf, best_box, best_frame, now - state.first_seen, best_recv_time
+        return None
+
+    def recently_decided(self, track_id, class_id, box, now):
+        # 쿨다운 안에 같은 클래스로 결정된 (제거된 / 다른 살아 있는) 트랙과 겹치는지
+        while self.recent and now - self.recent[0][2] > self.cooldown:
+            self.recent.popleft()
+        candidates = list(self.recent) + [
+            (state.decided_class, state.last_box, state.last_seen)
+            for other_id, state in self.tracks.items() if other_id != track_id and state.decided
+        ]
+        return any(
+            decided_class == class_id and now - last_seen <= self.cooldown and iou(box, last_box) >= self.cooldown_iou
+            for decided_class, last_box, last_seen in candidates
+        )
+
+    def remove(self, track_id):
+        state = self.tracks.pop(track_id, None)
+        if state is not None and state.decided:
+            self.recent.append((state.decided_class, state.last_box, state.last_seen))
@@ -114,8 +114,8 @@ class InferenceThread(threading.Thread):
             except queue.Empty:
                 continue
             current_time = time.time()
-            boxes, class_ids, confs = detector.detect_all(frame)
-            for box, class_id, conf in zip(boxes, class_ids, confs):
+            dets = detector.detect_all(frame)
+            for box, class_id, conf in zip(dets.boxes.tolist(), dets.class_ids.tolist(), dets.confs.tolist()):
                 if conf < CONF_THRESHOLD:
                     continue
                 matched = False
@@ -0,0 +1,77 @@
+import math
+import threading
+
+
+# ===============================
+# YOLO 감지 주기 스케줄러
+# - interval 프레임마다 한 번 감지(keyframe), 그 사이 프레임은 트래커로 박스 전파
+# - adaptive 모드: 추론 시간 / 프레임 수신 간격, frame_queue 깊이로 주기 자동 조정
+# ===============================
+class DetectionScheduler:
+    def __init__(self, interval=1, adaptive=False, max_interval=6, queue_capacity=8, smoothing=0.2):
+        self.interval = max(1, interval)
+        self.adaptive = adaptive
+        self.max_interval = max_interval
+        self.queue_capacity = queue_capacity
+        self.smoothing = smoothing
+
+        self.frames_since_detect = self.interval
+        # 로그 구간 통계 (reset_stats 로 초기화) / 메트릭용 누적값
+        self.total_frames = 0
+        self.detected_frames = 0
+        self.cumulative_frames = 0
+        self.cumulative_detected = 0
+
+        # 지수이동평균 (초 단위)
+        self.latency = None
+        self.frame_period = None
+        self.last_arrival = None
+        self.lock = threading.Lock()
+
+    def _ema(self, prev, value):
+        return value if prev is None else prev + self.smoothing * (value - prev)
+
+    @property
+    def detect_ratio(self):
+        return self.detected_frames / self.total_frames if self.total_frames else 0.0
+
+    # 수신 스레드에서 프레임 도착 시 호출
+    def record_arrival(self, now):
+        with self.lock:
+            if self.last_arrival is not None:
+                self.frame_period = self._ema(self.frame_period, now - self.last_arrival)
+            self.last_arrival = now
+
+    # 감지 1회(배치 포함) 소요 시간 기록
+    def record_latency(self, seconds, num_frames=1):
+        self.latency = self._ema(self.latency, seconds / max(num_frames, 1))
+
+    def should_detect(self, force=False):
+        self.total_frames += 1
+        self.cumulative_frames += 1
+        self.frames_since_detect += 1
+        if force or self.frames_since_detect >= self.interval:
+            self.mark_detected()
+            return True
+        return False
+
+    # keyframe 이 아니었지만 트랙 유실 등으로 즉시 재감지한 경우
+    def mark_detected(self):
+        self.detected_frames += 1
+        self.cumulative_detected += 1
+        self.frames_since_detect = 0
+
+    def update_interval(self, queue_depth):
+        if not self.adaptive or self.latency is None:
+            return
+        with self.lock:
+            frame_period = self.frame_period
+        # 감지 1회가 프레임 간격보다 길면 그만큼 건너뛰어야 따라잡을 수 있음
+        target = math.ceil(self.latency / frame_period) if frame_period else self.interval
+        if queue_depth >= self.queue_capacity // 2:
+            target = max(target, self.interval + 1)
+        self.interval = min(max(target, 1), self.max_interval)
+
+    def reset_stats(self):
+        self.total_frames = 0
+        self.detected_frames = 0
@@ -0,0 +1,105 @@
+import collections
+import queue
+import threading
+import time
+
+
+# ===============================
+# 최신 프레임 우선 링 버퍼
+# - 가득 차면 가장 오래된 프레임을 덮어씀 (수신 스레드는 절대 블록되지 않음)
+# - 각 프레임에 수신 시각을 붙이고, get() 시 max_age 보다 오래된 프레임은 폐기
+# ===============================
+class FrameRingBuffer:
+    def __init__(self, capacity=8, on_drop=None):
+        self.maxsize = capacity
+        self.entries = collections.deque()
+        self.cond = threading.Condition()
+        # 덮어쓰기/만료로 버려지는 항목 정리용 콜백 (예: 버퍼 반납)
+        self.on_drop = on_drop
+
+        self.overwritten = 0
+        self.expired = 0
+
+    def qsize(self):
+        with self.cond:
+            return len(self.entries)
+
+    # 가장 오래된 프레임의 수신 시각 (없으면 None) - deadline 우선 스케줄링용
+    def peek_time(self):
+        with self.cond:
+            return self.entries[0][0] if self.entries else None
+
+    def _drop(self, item):
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def put(self, item, recv_time=None):
+        recv_time = time.time() if recv_time is None else recv_time
+        dropped = None
+        with self.cond:
+            if len(self.entries) >= self.maxsize:
+                _, dropped = self.entries.popleft()
+                self.overwritten += 1
+            self.entries.append((recv_time, item))
+            self.cond.notify()
+        if dropped is not None:
+            self._drop(dropped)
+
+    def get(self, timeout=None, max_age=None):
+        """
+        가장 오래된 유효 프레임을 꺼냄
+        :param max_age: 수신 후 이 시간(초)이 지난 프레임은 만료 처리
+        :return: (item, recv_time)
+        :raises queue.Empty: timeout 내에 유효한 프레임이 없을 때
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        expired = []
+        try:
+            with self.cond:
+                while True:
+                    now = time.time()
+                    while self.entries:
+                        recv_time, item = self.entries.popleft()
+                        if max_age is not None and now - recv_time > max_age:
+                            self.expired += 1
+                            expired.append(item)
+                            continue
+                        return item, recv_time
+
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    self.cond.wait(remaining)
+        finally:
+            for item in expired:
+                self._drop(item)
+
+
+# ===============================
+# 수신 버퍼 풀 (recv_into 로 재사용, 패킷마다 64KB 새로 할당하지 않음)
+# ===============================
+class BufferPool:
+    def __init__(self, count, size=65536):
+        self.count = count
+        self.size = size
+        self.free = collections.deque(bytearray(size) for _ in range(count))
+        self.lock = threading.Lock()
+        # 풀이 비어서 새로 할당한 횟수 (많으면 count 를 늘릴 것)
+        self.misses = 0
+
+    def acquire(self):
+        with self.lock:
+            if self.free:
+                return self.free.pop()
+            self.misses += 1
+        return bytearray(self.size)
+
+    # 세션(카메라)이 늘어나면 보관할 버퍼 수도 늘림 (실제 할당은 필요할 때)
+    def grow(self, count):
+        with self.lock:
+            self.count += count
+
+    def release(self, buf):
+        with self.lock:
+            if len(self.free) < self.count:
+                self.free.append(buf)
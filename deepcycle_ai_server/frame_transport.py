@@ -0,0 +1,171 @@
+import struct
+import time
+
+# ===============================
+# 청크 단위 UDP 프레임 전송 프로토콜
+# 헤더 (network byte order, 24 bytes)
+#   magic(2) "DC" | version(1) | flags(1) | source_id(2) | frame_seq(4)
+#   chunk_idx(2) | chunk_count(2) | chunk_size(2) | capture_ts(8, float 초)
+# chunk_size 는 마지막 청크를 제외한 청크의 페이로드 크기 (청크 위치 = chunk_idx * chunk_size)
+# ※ client/gui/frame_transport.py 와 형식을 동일하게 유지할 것
+# ===============================
+MAGIC = b"DC"
+VERSION = 1
+HEADER = struct.Struct("!2sBBHIHHHd")
+HEADER_SIZE = HEADER.size
+
+# IP 단편화를 피하도록 이더넷 MTU(1500) - IP/UDP 헤더(28) 이하로 유지
+MAX_DATAGRAM = 1472
+CHUNK_PAYLOAD = MAX_DATAGRAM - HEADER_SIZE
+
+
+def is_chunk_packet(packet):
+    return len(packet) >= HEADER_SIZE and bytes(packet[:2]) == MAGIC
+
+
+def fragment_frame(data, source_id, frame_seq, capture_ts=None, chunk_payload=CHUNK_PAYLOAD):
+    """
+    JPEG 바이트를 헤더가 붙은 데이터그램 리스트로 분할
+    """
+    capture_ts = time.time() if capture_ts is None else capture_ts
+    chunk_count = max(1, -(-len(data) // chunk_payload))
+    if chunk_count > 0xFFFF:
+        raise ValueError(f"frame too large: {len(data)} bytes")
+    view = memoryview(data)
+    packets = []
+    for idx in range(chunk_count):
+        header = HEADER.pack(MAGIC, VERSION, 0, source_id & 0xFFFF, frame_seq & 0xFFFFFFFF,
+                             idx, chunk_count, chunk_payload, capture_ts)
+        packets.append(header + view[idx * chunk_payload:(idx + 1) * chunk_payload])
+    return packets
+
+
+# ===============================
+# 카메라(소스)별 수신 통계
+# ===============================
+class SourceStats:
+    def __init__(self):
+        self.frames_completed = 0
+        self.frames_dropped = 0
+        self.frames_missing = 0     # 청크가 하나도 도착하지 않은 프레임 (seq 건너뜀)
+        self.chunks_received = 0
+        self.chunks_lost = 0
+        self.jitter = 0.0           # RFC 3550 방식 도착 지터 (초)
+        self.last_seq = None
+        self.last_transit = None
+
+    def on_frame_seq(self, seq):
+        if self.last_seq is not None:
+            gap = (seq - self.last_seq) & 0xFFFFFFFF
+            if 1 < gap < 0x80000000:
+                self.frames_missing += gap - 1
+        if self.last_seq is None or 0 < ((seq - self.last_seq) & 0xFFFFFFFF) < 0x80000000:
+            self.last_seq = seq
+
+    def on_frame_complete(self, capture_ts, arrival):
+        self.frames_completed += 1
+        transit = arrival - capture_ts
+        if self.last_transit is not None:
+            self.jitter += (abs(transit - self.last_transit) - self.jitter) / 16
+        self.last_transit = transit
+
+    @property
+    def loss_rate(self):
+        total = self.frames_completed + self.frames_dropped + self.frames_missing
+        return (self.frames_dropped + self.frames_missing) / total if total else 0.0
+
+    def summary(self):
+        return (f"완료 {self.frames_completed}, 불완전 드롭 {self.frames_dropped}, 누락 {self.frames_missing}, "
+                f"손실률 {self.loss_rate:.1%}, 지터 {self.jitter * 1000:.1f} ms")
+
+
+class _PendingFrame:
+    __slots__ = ("buf", "chunk_count", "received", "nbytes", "first_arrival", "capture_ts")
+
+    def __init__(self, buf, chunk_count, first_arrival, capture_ts):
+        self.buf = buf
+        self.chunk_count = chunk_count
+        self.received = set()
+        self.nbytes = 0
+        self.first_arrival = first_arrival
+        self.capture_ts = capture_ts
+
+
+# ===============================
+# 프레임 재조립 테이블
+# - 청크는 BufferPool 의 버퍼에 바로 복사
+# - timeout 이 지나거나 같은 소스의 더 새로운 프레임이 완성되면 미완성 프레임은 폐기
+# ===============================
+class FrameReassembler:
+    def __init__(self, pool, timeout=0.5, max_pending_per_source=4):
+        self.pool = pool
+        self.timeout = timeout
+        self.max_pending = max_pending_per_source
+        self.pending = {}   # (source_key, frame_seq) → _PendingFrame
+        self.stats = {}     # source_key → SourceStats
+
+    def source_stats(self, source_key):
+        stats = self.stats.get(source_key)
+        if stats is None:
+            stats = self.stats[source_key] = SourceStats()
+        return stats
+
+    def _drop(self, key):
+        entry = self.pending.pop(key)
+        stats = self.source_stats(key[0])
+        stats.frames_dropped += 1
+        stats.chunks_lost += entry.chunk_count - len(entry.received)
+        self.pool.release(entry.buf)
+
+    def add(self, packet, addr, arrival=None):
+        """
+        청크 하나를 추가
+        :param addr: 송신 주소 (source_id 와 함께 소스 구분에 사용)
+        :return: 프레임 완성 시 (buf, nbytes, source_key, capture_ts, first_arrival), 아니면 None
+        """
+        arrival = time.time() if arrival is None else arrival
+        magic, version, _, source_id, seq, idx, count, chunk_size, capture_ts = HEADER.unpack_from(packet)
+        if version != VERSION or idx >= count:
+            return None
+        payload = packet[HEADER_SIZE:]
+        offset = idx * chunk_size
+        if offset + len(payload) > self.pool.size:
+            return None
+
+        source_key = (addr[0], source_id)
+        stats = self.source_stats(source_key)
+        stats.chunks_received += 1
+
+        key = (source_key, seq)
+        entry = self.pending.get(key)
+        if entry is None:
+            stats.on_frame_seq(seq)
+            self._evict(source_key)
+            entry = self.pending[key] = _PendingFrame(self.pool.acquire(), count, arrival, capture_ts)
+        if idx in entry.received:
+            return None
+
+        entry.buf[offset:offset + len(payload)] = payload
+        entry.received.add(idx)
+        entry.nbytes = max(entry.nbytes, offset + len(payload))
+        if len(entry.received) < entry.chunk_count:
+            return None
+
+        del self.pending[key]
+        stats.on_frame_complete(entry.capture_ts, arrival)
+        # 완성된 프레임보다 오래된 같은 소스의 미완성 프레임은 더 이상 쓸모 없음
+        for old_key in [k for k in self.pending if k[0] == source_key and 0 < ((seq - k[1]) & 0xFFFFFFFF) < 0x80000000]:
+            self._drop(old_key)
+        return entry.buf, entry.nbytes, source_key, entry.capture_ts, entry.first_arrival
+
+    def _evict(self, source_key):
+        keys = [k for k in self.pending if k[0] == source_key]
+        while len(keys) >= self.max_pending:
+            oldest = min(keys, key=lambda k: self.pending[k].first_arrival)
+            self._drop(oldest)
+            keys.remove(oldest)
+
+    def expire(self, now=None):
+        now = time.time() if now is None else now
+        for key in [k for k, e in self.pending.items() if now - e.first_arrival > self.timeout]:
+            self._drop(key)
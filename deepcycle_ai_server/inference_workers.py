@@ -0,0 +1,247 @@
+import atexit
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils import crop_roi
+from yolo_detector import Detections
+
+
+# ===============================
+# 공유 메모리 프레임 슬롯
+# 프레임은 슬롯에 한 번 복사되고, 워커는 같은 메모리를 NumPy 배열로 바로 읽음 (pickle 없음)
+# ===============================
+class SharedFrameSlots:
+    def __init__(self, num_slots, max_frame_shape, name=None):
+        self.num_slots = num_slots
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * num_slots)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def write(self, slot, frame):
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame {frame.shape} exceeds shared slot size ({self.slot_bytes} bytes)")
+        self.view(slot, frame.shape)[...] = frame
+        return frame.shape
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(model_path, detector_kwargs, shm_name, num_slots, max_frame_shape, num_threads, task_queue, done_queue):
+    import torch
+    from yolo_detector import YoloDetector
+
+    # 워커끼리 코어를 나눠 쓰도록 torch 스레드 수 제한
+    torch.set_num_threads(num_threads)
+    detector = YoloDetector(model_path, **detector_kwargs)
+    slots = SharedFrameSlots(num_slots, max_frame_shape, name=shm_name)
+    done_queue.put(("ready", os.getpid()))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        job_id, items = task
+        try:
+            frames = [slots.view(slot, shape) for slot, shape in items]
+            results = detector.detect_batch(frames) if len(frames) > 1 else [detector.detect_all(frames[0])]
+            # 공유 메모리 뷰는 돌려보내지 않음 (프레임 참조는 부모 프로세스에서 다시 연결)
+            for detections in results:
+                detections.frame = None
+            done_queue.put((job_id, results))
+        except Exception as e:
+            done_queue.put((job_id, e))
+    slots.close()
+
+
+# ===============================
+# 추론 워커 프로세스 풀
+# YoloDetector 와 같은 detect_all / detect_batch 인터페이스
+# → 배치를 워커 수만큼 나눠 K 개 프로세스에서 동시에 추론 후 입력 순서대로 합침
+# 워커가 오류를 돌려주거나, 죽거나, job_timeout 동안 응답이 없으면 그 프레임은 빈 Detections 로 돌려주고
+# (추론 스레드는 계속) 죽은 / 멈춘 워커는 새로 띄우고 슬롯을 회수
+# ===============================
+class InferenceWorkerPool:
+    def __init__(self, model_path, num_workers, max_frame_shape=(1080, 1920, 3), slots_per_worker=4,
+                 threads_per_worker=None, start_timeout=120, job_timeout=60, detector_kwargs=None):
+        """
+        :param start_timeout: 워커 모델 로드 대기 시간 (시작 시 넘으면 예외, 재시작 중이면 그 배치만 빈 결과)
+        :param job_timeout: 작업 하나를 이 시간 안에 돌려주지 않으면 워커가 멈춘 것으로 보고 재시작
+        """
+        self.num_workers = num_workers
+        self.start_timeout = start_timeout
+        self.job_timeout = job_timeout
+        num_slots = num_workers * slots_per_worker
+        self.slots = SharedFrameSlots(num_slots, max_frame_shape)
+        self.free_slots = list(range(num_slots))
+        threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+
+        # torch 가 로드된 프로세스를 fork 하지 않도록 spawn 사용
+        self.ctx = mp.get_context("spawn")
+        self.worker_args = (model_path, detector_kwargs or {}, self.slots.name, num_slots, max_frame_shape,
+                            threads_per_worker)
+        self.done_queue = self.ctx.Queue()
+        # 워커마다 작업 큐를 따로 (죽은 워커가 가져간 작업 / 슬롯을 알 수 있도록)
+        self.task_queues = [None] * num_workers
+        self.workers = [None] * num_workers
+        self.ready = set()          # 모델 로드를 마친 워커 pid
+        for i in range(num_workers):
+            self._spawn(i)
+        for _ in self.workers:
+            _, pid = self.done_queue.get(timeout=start_timeout)
+            self.ready.add(pid)
+
+        self.next_job_id = 0
+        self.restarts = 0
+        self.failed_frames = 0
+        self.closed = False
+        atexit.register(self.close)
+        print(f"[🧵] 추론 워커 {num_workers}개 시작됨 (워커당 torch 스레드 {threads_per_worker})")
+
+    def _spawn(self, index):
+        self.task_queues[index] = self.ctx.Queue()
+        worker = self.ctx.Process(
+            target=_worker_main,
+            args=(*self.worker_args, self.task_queues[index], self.done_queue),
+            name=f"InferenceWorker-{index}",
+            daemon=True
+        )
+        worker.start()
+        self.workers[index] = worker
+
+    def _restart(self, index, jobs):
+        """
+        워커 index 를 새로 띄우고, 그 워커에 보낸 작업은 포기 (슬롯 회수, 프레임은 빈 결과)
+        """
+        old = self.workers[index]
+        if old.is_alive():
+            old.terminate()
+        old.join(timeout=5)
+        self.ready.discard(old.pid)
+        # 죽은 워커의 큐에 남은 작업 때문에 종료 시 멈추지 않도록
+        self.task_queues[index].cancel_join_thread()
+        for job_id in [job_id for job_id, (worker, _, _) in jobs.items() if worker == index]:
+            _, indices, used_slots = jobs.pop(job_id)
+            self.free_slots.extend(used_slots)
+            self.failed_frames += len(indices)
+        self.restarts += 1
+        self._spawn(index)
+
+    def _ready_workers(self):
+        # 작업 없이 죽어 있던 워커도 여기서 재시작 (모델 로드가 끝나면 ready 로 합류)
+        for index, worker in enumerate(self.workers):
+            if not worker.is_alive():
+                print(f"[❌] 추론 워커 {index} 종료됨 (exitcode {worker.exitcode}) → 재시작")
+                self._restart(index, {})
+        return [index for index, worker in enumerate(self.workers) if worker.pid in self.ready]
+
+    def _wait_for_ready(self):
+        # 준비된 워커가 하나도 없을 때 (모두 재시작 중) 하나라도 준비될 때까지
+        deadline = time.monotonic() + self.start_timeout
+        while time.monotonic() < deadline:
+            try:
+                job_id, payload = self.done_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self.workers):
+                    return False
+                continue
+            if job_id == "ready":
+                self.ready.add(payload)
+                return True
+        return False
+
+    def detect_all(self, frame, roi=None):
+        return self.detect_batch([frame], [roi])[0]
+
+    def detect_batch(self, frames, rois=None):
+        # ROI 크롭만 슬롯에 복사 → 워커는 크롭 크기에 맞는 입력으로 추론, 오프셋은 여기서 되돌림
+        crops, offsets = zip(*(crop_roi(frame, roi) for frame, roi in zip(frames, rois or [None] * len(frames))))
+        results = [None] * len(frames)
+        pending = list(range(len(frames)))
+        while pending:
+            workers = self._ready_workers()
+            if not workers:
+                if self._wait_for_ready():
+                    continue
+                print(f"[❌] 준비된 추론 워커 없음 - {len(pending)} 프레임 빈 결과")
+                self.failed_frames += len(pending)
+                break
+            # 남은 슬롯만큼만 프레임을 슬롯에 올리고, 준비된 워커 수만큼 나눠서 작업 전송
+            count = min(len(pending), len(self.free_slots))
+            chunk, pending = pending[:count], pending[count:]
+            jobs = {}
+            per_worker = -(-len(chunk) // len(workers))
+            for worker, start in zip(workers, range(0, len(chunk), per_worker)):
+                indices = chunk[start:start + per_worker]
+                items = []
+                for i in indices:
+                    slot = self.free_slots.pop()
+                    items.append((slot, self.slots.write(slot, crops[i])))
+                job_id = self.next_job_id
+                self.next_job_id += 1
+                jobs[job_id] = (worker, indices, [slot for slot, _ in items])
+                self.task_queues[worker].put((job_id, items))
+            self._collect(jobs, frames, offsets, results)
+        return [detections if detections is not None else Detections.empty(frame)
+                for frame, detections in zip(frames, results)]
+
+    def _collect(self, jobs, frames, offsets, results):
+        deadline = time.monotonic() + self.job_timeout
+        while jobs:
+            try:
+                job_id, payload = self.done_queue.get(timeout=1.0)
+            except queue.Empty:
+                job_id = None
+            if job_id == "ready":
+                self.ready.add(payload)
+            elif job_id in jobs:
+                _, indices, used_slots = jobs.pop(job_id)
+                self.free_slots.extend(used_slots)
+                if isinstance(payload, Exception):
+                    print(f"[⚠️] 추론 워커 오류 - {len(indices)} 프레임 빈 결과: {payload}")
+                    self.failed_frames += len(indices)
+                    continue
+                for i, detections in zip(indices, payload):
+                    detections.frame = frames[i]
+                    results[i] = detections.shift(*offsets[i])
+            # 작업이 남은 워커가 죽었거나 응답이 없으면 재시작
+            timed_out = time.monotonic() >= deadline
+            for index in {worker for worker, _, _ in jobs.values()}:
+                worker = self.workers[index]
+                if worker.is_alive() and not timed_out:
+                    continue
+                if worker.is_alive():
+                    print(f"[❌] 추론 워커 {index} 가 {self.job_timeout}s 동안 응답 없음 → 재시작")
+                else:
+                    print(f"[❌] 추론 워커 {index} 종료됨 (exitcode {worker.exitcode}) → 재시작")
+                self._restart(index, jobs)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.slots.close()
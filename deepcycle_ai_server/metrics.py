@@ -0,0 +1,191 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 지연 히스토그램 버킷 상한 (ms), 마지막 버킷은 +Inf
+# (결정 / 결과 지연은 투표 윈도우 10초를 넘을 수 있어 60초까지)
+LATENCY_BUCKETS_MS = (1, 2, 3, 5, 7, 10, 15, 20, 30, 50, 70, 100, 150, 200, 300, 500, 700, 1000, 2000, 5000,
+                      10000, 20000, 30000, 60000)
+
+
+# ===============================
+# 고정 버킷 지연 히스토그램 (값을 쌓아 두지 않으므로 메모리 일정)
+# ===============================
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+            self.count += 1
+            self.total += ms
+            self.min = min(self.min, ms)
+            self.max = max(self.max, ms)
+
+    def _percentile(self, counts, count, q, min_ms, max_ms):
+        # 해당 분위가 들어 있는 버킷 안에서 선형 보간 (관측 최소 ~ 최대값 범위로 제한)
+        target = q * count
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if n and cumulative + n >= target:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else max_ms
+                return min(max(lower + (upper - lower) * (target - cumulative) / n, min_ms), max_ms)
+            cumulative += n
+        return max_ms
+
+    def snapshot(self):
+        with self.lock:
+            counts, count, total, min_ms, max_ms = list(self.counts), self.count, self.total, self.min, self.max
+        if not count:
+            return {"count": 0}
+        return {
+            "count": count,
+            "mean_ms": total / count,
+            "max_ms": max_ms,
+            "p50_ms": self._percentile(counts, count, 0.5, min_ms, max_ms),
+            "p95_ms": self._percentile(counts, count, 0.95, min_ms, max_ms),
+            "p99_ms": self._percentile(counts, count, 0.99, min_ms, max_ms),
+            "buckets": counts,
+            "sum_ms": total,
+        }
+
+
+# ===============================
+# 파이프라인 계측
+#   observe / time : 단계별 지연 히스토그램 (receive, queue, decode, inference, tracking, contamination, vote, decision, result, encode, upload, export)
+#   inc            : 이벤트 카운터 (이 모듈이 직접 세는 것)
+#   add_collector  : 조회 시점에 값을 읽어 오는 함수 (큐 깊이, 다른 객체가 이미 세고 있는 누적 카운터)
+#                    이름에 라벨을 붙일 수 있음 (예: 'session_detect_ratio{source="10.0.0.2:1"}')
+# ===============================
+class Metrics:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+
+    def observe(self, stage, seconds):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def inc(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def snapshot(self):
+        gauges = {}
+        for collector in self.collectors:
+            try:
+                gauges.update(collector())
+            except Exception as e:
+                print(f"[⚠️] 메트릭 수집 실패 ({getattr(collector, '__name__', collector)}): {e}")
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {
+            "timestamp": time.time(),
+            "uptime": time.time() - self.start_time,
+            "latency_ms": {stage: histogram.snapshot() for stage, histogram in histograms.items()},
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def prometheus(self):
+        # Prometheus text format (deepcycle_ 접두사)
+        snapshot = self.snapshot()
+        lines = []
+        for stage, h in snapshot["latency_ms"].items():
+            name = f"deepcycle_{stage}_latency_ms"
+            lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for upper, n in zip(list(LATENCY_BUCKETS_MS) + ["+Inf"], h.get("buckets", [])):
+                cumulative += n
+                lines.append(f'{name}_bucket{{le="{upper}"}} {cumulative}')
+            lines.append(f"{name}_sum {h.get('sum_ms', 0.0):.3f}")
+            lines.append(f"{name}_count {h['count']}")
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE deepcycle_{name} counter")
+            lines.append(f"deepcycle_{name} {value}")
+        # 라벨만 다른 값은 한 이름 아래로 모아서 (TYPE 한 번), _total 로 끝나면 누적 카운터
+        families = {}
+        for name, value in snapshot["gauges"].items():
+            families.setdefault(name.split("{", 1)[0], []).append(f"deepcycle_{name} {value}")
+        for family, samples in families.items():
+            lines.append(f"# TYPE deepcycle_{family} {'counter' if family.endswith('_total') else 'gauge'}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    # ===============================
+    # 로컬 HTTP 엔드포인트: /metrics (Prometheus text), /metrics.json
+    # ===============================
+    def serve(self, host="127.0.0.1", port=9358):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            # 포트가 이미 쓰이고 있어도 AI 서버는 계속 (메트릭 엔드포인트만 없음)
+            print(f"[⚠️] 메트릭 엔드포인트 시작 실패 ({host}:{port}): {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+        print(f"[📈] 메트릭 엔드포인트: http://{host}:{port}/metrics (.json)")
+        return server
+
+    def start_dump(self, path, interval=30):
+        # interval 초마다 스냅샷을 JSON 한 줄씩 파일에 추가
+        def dump():
+            while True:
+                time.sleep(interval)
+                try:
+                    with open(path, "a") as f:
+                        f.write(json.dumps(self.snapshot()) + "\n")
+                except OSError as e:
+                    print(f"[⚠️] 메트릭 파일 기록 실패: {e}")
+
+        threading.Thread(target=dump, name="MetricsDump", daemon=True).start()
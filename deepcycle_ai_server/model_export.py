@@ -0,0 +1,129 @@
+import glob
+import hashlib
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+# ===============================
+# CPU 최적화 런타임용 모델 변환 (ONNX Runtime / OpenVINO, 선택적으로 INT8 양자화)
+# 변환 결과는 .pt 옆 model_cache/ 에 가중치 해시 + 변환 옵션으로 키를 붙여 저장하고, 이미 있으면 재사용
+#   12_model.pt → model_cache/12_model-<key>.onnx / 12_model-<key>_int8.onnx / 12_model-<key>_openvino_model/
+# → 같은 이름으로 가중치를 덮어써도 예전 변환 결과를 잘못 쓰지 않음
+# ===============================
+BACKENDS = ("torch", "onnx", "openvino")
+
+_weights_hashes = {}    # (path, size, mtime) → sha256 (한 프로세스 안에서 다시 읽지 않음)
+
+
+def weights_hash(model_path):
+    stat = os.stat(model_path)
+    cache_key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    digest = _weights_hashes.get(cache_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(model_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = _weights_hashes[cache_key] = h.hexdigest()
+    return digest
+
+
+def exported_path(model_path, backend, int8=False, calibration_data=None, imgsz=640):
+    if backend == "torch":
+        return model_path
+    options = f"{weights_hash(model_path)}|{imgsz}|{calibration_data if int8 else ''}"
+    key = hashlib.sha256(options.encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(model_path))[0] + f"-{key}" + ("_int8" if int8 else "")
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(model_path)), "model_cache")
+    if backend == "onnx":
+        return os.path.join(cache_dir, stem + ".onnx")
+    return os.path.join(cache_dir, stem + "_openvino_model")
+
+
+def export_model(model_path, backend, int8=False, calibration_data=None, imgsz=640):
+    """
+    .pt 모델을 backend 형식으로 변환하고 경로 반환
+    :param calibration_data: INT8 보정용 데이터
+        - onnx: 샘플 이미지 폴더 (정적 양자화)
+        - openvino: 데이터셋 yaml (Ultralytics/NNCF 보정)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend} (available: {', '.join(BACKENDS)})")
+    if backend == "torch":
+        return model_path
+    target = exported_path(model_path, backend, int8, calibration_data, imgsz)
+    if os.path.exists(target):
+        print(f"[🔧] 변환된 모델 재사용: {target}")
+        return target
+    if int8 and not calibration_data:
+        raise ValueError("INT8 양자화에는 calibration_data 가 필요합니다")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    from ultralytics import YOLO
+
+    print(f"[🔧] 모델 변환: {model_path} → {target}")
+    if backend == "openvino":
+        exported = YOLO(model_path).export(format="openvino", imgsz=imgsz, dynamic=True,
+                                           int8=int8, data=calibration_data if int8 else None)
+        shutil.move(exported, target)
+        return target
+
+    # 변환이 끝난 파일만 캐시 경로로 옮김 (중간에 종료돼도 깨진 파일을 재사용하지 않도록)
+    fp32_path = exported_path(model_path, "onnx", imgsz=imgsz)
+    if not os.path.exists(fp32_path):
+        exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        shutil.move(exported, fp32_path)
+    if int8:
+        quantize_onnx_static(fp32_path, target + ".tmp", calibration_data, imgsz)
+        os.replace(target + ".tmp", target)
+    return target
+
+
+# ===============================
+# ONNX 정적 INT8 양자화 (우리 이미지 샘플로 보정)
+# ===============================
+def letterbox(frame, imgsz=640):
+    h, w = frame.shape[:2]
+    scale = imgsz / max(h, w)
+    resized = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - resized.shape[0]) // 2
+    left = (imgsz - resized.shape[1]) // 2
+    canvas[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+    return canvas
+
+
+def quantize_onnx_static(fp32_path, int8_path, image_dir, imgsz=640, max_images=200):
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    paths = sorted(glob.glob(os.path.join(image_dir, "*.jpg")) + glob.glob(os.path.join(image_dir, "*.png")))[:max_images]
+    if not paths:
+        raise FileNotFoundError(f"보정용 이미지를 찾을 수 없습니다: {image_dir}")
+
+    class ImageReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self.input_name = input_name
+            self.paths = iter(paths)
+
+        def get_next(self):
+            for path in self.paths:
+                frame = cv2.imread(path)
+                if frame is None:
+                    continue
+                # Ultralytics 전처리와 동일: letterbox → BGR→RGB → CHW → 0~1
+                x = letterbox(frame, imgsz)[:, :, ::-1].transpose(2, 0, 1)
+                return {self.input_name: np.ascontiguousarray(x, dtype=np.float32)[None] / 255.0}
+            return None
+
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    print(f"[🔧] INT8 정적 양자화: 보정 이미지 {len(paths)}장")
+    quantize_static(
+        fp32_path, int8_path, ImageReader(input_name),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
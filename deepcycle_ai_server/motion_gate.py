@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+
+
+# ===============================
+# 움직임 게이트 (추론 전 저비용 필터)
+# 프레임을 작게 줄인 흑백 영상으로 배경 모델과 비교해서
+# 바뀐 픽셀 비율이 threshold 미만이면 정적 장면으로 판단
+# ===============================
+class MotionGate:
+    def __init__(self, threshold=0.01, pixel_diff=25, size=(64, 48), learning_rate=0.05):
+        """
+        :param threshold: 바뀐 픽셀 비율이 이 값 이상이면 움직임 (민감도)
+        :param pixel_diff: 픽셀 밝기 차이가 이 값보다 커야 바뀐 픽셀로 계산
+        :param learning_rate: 배경 모델 갱신 비율 (놓여진 채 멈춘 물체는 서서히 배경이 됨)
+        """
+        self.threshold = threshold
+        self.pixel_diff = pixel_diff
+        self.size = size
+        self.learning_rate = learning_rate
+        self.background = None
+        self.last_change = 0.0
+
+        self.gated = 0
+        self.passed = 0
+
+    def is_static(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray
+            return False
+
+        changed = np.abs(gray - self.background) > self.pixel_diff
+        self.last_change = float(changed.mean())
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+        return self.last_change < self.threshold
+
+    def should_skip(self, frame, tracking):
+        """
+        추적 중인 객체가 없고 장면이 바뀌지 않았으면 True (추론 생략)
+        배경 모델은 추적 중에도 매 프레임 갱신
+        """
+        static = self.is_static(frame)
+        if static and not tracking:
+            self.gated += 1
+            return True
+        self.passed += 1
+        return False
+
+    def reset_stats(self):
+        self.gated = 0
+        self.passed = 0
@@ -5,34 +5,281 @@ import threading
 import queue
 import time
 import json
-import requests
 import signal
 import sys
 
-from yolo_detector import YoloDetector, CLASS_NAMES
-from utils import encode_image_to_base64, iou
-from opencv_tracker_factory import create_tracker
-
-
-# 재학습용 데이터 전송 스위치 
-SEND_TRAINING_DATA = True
+from yolo_detector import YoloDetector, Detections, CLASS_NAMES
+from inference_workers import InferenceWorkerPool
+from model_export import export_model
+from utils import decode_image, crop_roi, pad_box
+from association import associate
+from detection_scheduler import DetectionScheduler
+from frame_buffer import FrameRingBuffer, BufferPool
+from frame_transport import FrameReassembler, is_chunk_packet
+from tracker_backends import create_tracker_backend
+from session import Session, SessionManager
+from decision_engine import DecisionEngine
+from motion_gate import MotionGate
+from crop_cache import CropCache
+from contamination import ContaminationCheck, CONTAMINATED_CLASS_ID, CONTAMINATED_CLASS_NAME
+from vote_aggregator import VoteAggregator
+from uploader import Uploader
+from dataset_exporter import DatasetExporter
+from metrics import Metrics
+
+
+# DB 서버 결과 업로드 스위치 (업로드 응답으로 DB 서버가 ESP32 쓰레기통에 알리므로 운영 중에는 항상 True)
+# False 는 벤치마크 / 오프라인 테스트용 - 재학습 데이터 수집만 끄려면 EXPORT_DATASET 을 사용
+UPLOAD_RESULTS = True
+# 업로드 이미지: 기본은 클라이언트가 보낸 원본 JPEG 그대로 (박스는 box 메타데이터로 전송)
+# UPLOAD_ANNOTATED = True 면 박스를 그려서 다시 인코딩 (관리자 확인용, 학습 데이터로는 EXPORT_DATASET 사용)
+UPLOAD_ANNOTATED = False
+# 업로드 이미지 범위 (관리자 화면은 물체만 보면 되므로 crop 이 전송량 / DB 서버 디스크 사용이 가장 적음)
+#   "full"     : 전체 프레임 (원본 JPEG 가 있으면 그대로)
+#   "crop"     : 박스 + 여백 UPLOAD_CROP_PADDING (박스 크기 대비 비율) 만 잘라서
+#   "downscale": 전체 프레임을 긴 변 UPLOAD_MAX_SIDE 이하로 줄여서
+# 다시 인코딩하는 경우 JPEG 품질은 UPLOAD_JPEG_QUALITY
+# box 는 항상 원본 프레임 좌표로 보내고, 이미지 좌표 변환은 crop_offset / image_scale 로 함께 전송
+# → 이미지 좌표 = (box - crop_offset) * image_scale
+UPLOAD_PAYLOAD = "full"
+UPLOAD_CROP_PADDING = 0.25
+UPLOAD_MAX_SIDE = 640
+UPLOAD_JPEG_QUALITY = 80
+
+# 재학습 데이터 로컬 내보내기: keyframe 감지 결과를 원본 프레임 + YOLO 라벨로 EXPORT_DIR 샤드에 저장
+# 우선순위를 낮춘 별도 스레드가 중복 프레임을 거르고 EXPORT_BATCH_SIZE 개씩 몰아서 기록
+# (대기 중인 프레임이 EXPORT_MAX_PENDING 개를 넘으면 버림 → 추론 루프를 기다리게 하지 않음)
+EXPORT_DATASET = False
+EXPORT_DIR = "training_export"
+EXPORT_SHARD_MAX_MB = 256
+EXPORT_MAX_SHARDS = 20
+EXPORT_BATCH_SIZE = 16
+EXPORT_MIN_CONF = 0.7
+EXPORT_DEDUP_DISTANCE = 8
+EXPORT_MAX_PENDING = 16
+# dataset_exporter 는 __main__ 에서 생성 (기록 스레드 시작)
+dataset_exporter = None
 
 # YOLO 모델 
 MODEL_PATH = "/home/lim/dev_ws/deepcycle/12_model.pt"
-detector = YoloDetector(MODEL_PATH)
 CONF_THRESHOLD = 0.5
 
+# 추론 백엔드 ("torch" / "onnx" / "openvino") - CPU 서버는 onnx / openvino 권장
+# MODEL_INT8 = True 면 보정 데이터로 INT8 양자화한 모델 사용
+#   → onnx: 샘플 이미지 폴더, openvino: 데이터셋 yaml (선택 기준은 bench_model_backends.py 결과 참고)
+MODEL_BACKEND = "torch"
+MODEL_INT8 = False
+CALIBRATION_DATA = None
+
+# 추론 워커 프로세스 수 (0 이면 이 프로세스에서 직접 추론)
+# → 워커는 배치를 나눠 병렬 추론하므로 BATCH_SIZE 를 INFERENCE_WORKERS 이상으로 설정
+# → 프레임은 공유 메모리 슬롯으로 전달 (MAX_FRAME_SHAPE 이하 크기만 가능)
+INFERENCE_WORKERS = 0
+MAX_FRAME_SHAPE = (1080, 1920, 3)
+
+# detector 는 __main__ 에서 백그라운드로 생성 (spawn 된 워커 프로세스가 이 모듈을 import 할 때 모델을 다시 로드하지 않도록)
+# → 로드 / 워밍업 동안 수신 스레드는 먼저 프레임을 받아 두고, 준비되면 detector_ready 설정
+detector = None
+detector_ready = threading.Event()
+# 워밍업: 더미 프레임으로 MODEL_WARMUP_RUNS 번 추론 (첫 추론의 초기화 비용을 실제 프레임 전에 치름)
+MODEL_WARMUP_RUNS = 2
+WARMUP_FRAME_SHAPE = (360, 480, 3)
+START_TIME = time.time()
+
+
+def create_detector():
+    detector_kwargs = {"backend": MODEL_BACKEND, "int8": MODEL_INT8, "calibration_data": CALIBRATION_DATA}
+    if INFERENCE_WORKERS > 0:
+        # 워커들이 동시에 변환하지 않도록 변환은 먼저 한 번만
+        export_model(MODEL_PATH, MODEL_BACKEND, MODEL_INT8, CALIBRATION_DATA)
+        return InferenceWorkerPool(MODEL_PATH, INFERENCE_WORKERS, max_frame_shape=MAX_FRAME_SHAPE,
+                                   detector_kwargs=detector_kwargs)
+    return YoloDetector(MODEL_PATH, **detector_kwargs)
+
+
+def warm_up(model):
+    # 실제로 쓰일 입력 모양을 모두 한 번씩: 전체 프레임, 카메라별 ROI 크기, 배치 (워커마다 하나 이상)
+    frame = np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8)
+    rois = [None] + sorted(set(SOURCE_ROIS.values()))
+    batch = max(BATCH_SIZE, INFERENCE_WORKERS)
+    for _ in range(MODEL_WARMUP_RUNS):
+        for roi in rois:
+            model.detect_all(frame, roi=roi)
+        if batch > 1:
+            model.detect_batch([frame] * batch)
+
+
+def load_detector():
+    global detector
+    try:
+        start = time.time()
+        model = create_detector()
+        loaded = time.time()
+        warm_up(model)
+        detector = model
+        detector_ready.set()
+        print(f"[⏱] 모델 준비 완료: 로드 {loaded - start:.1f} s, 워밍업 {time.time() - loaded:.1f} s "
+              f"(서버 시작 후 {time.time() - START_TIME:.1f} s)")
+    except Exception as e:
+        print(f"[❌] 모델 로드 실패: {e}")
+        shutdown_event.set()
+
 # 서버 
 TCP_SERVER_URL = "http://192.168.0.56:5000/upload"
+TCP_SERVER_BINARY_URL = "http://192.168.0.56:5000/uploadBinary"
+# 업로드 방식: "binary" (이미지 바이트 그대로, /uploadBinary) / "json" (Base64 JSON, 이전 DB 서버 /upload)
+UPLOAD_FORMAT = "binary"
+# 업로드 동시 전송 수 / 재시도 횟수, DB 서버가 죽어 있는 동안 결과를 쌓아 둘 스풀 파일
+UPLOAD_MAX_IN_FLIGHT = 4
+UPLOAD_MAX_RETRIES = 3
+UPLOAD_SPOOL_PATH = "upload_spool.bin"
+UPLOAD_REPLAY_INTERVAL = 10
+# 스풀 재전송에서 5xx 로 이 횟수만큼 실패한 결과는 UPLOAD_SPOOL_PATH + ".dead" 로 옮기고 더 보내지 않음
+UPLOAD_MAX_ATTEMPTS = 5
+# uploader 는 __main__ 에서 생성 (전송 스레드 시작)
+uploader = None
+
+# 계측: 단계별 지연 히스토그램 / 큐 깊이 / 드롭 카운터
+# METRICS_PORT 로 로컬 HTTP 엔드포인트 (/metrics, /metrics.json), None 이면 끔
+# (9100 은 node_exporter 기본 포트라 피함, 포트가 사용 중이면 경고만 하고 엔드포인트 없이 실행)
+# METRICS_DUMP_PATH 가 있으면 METRICS_DUMP_INTERVAL 초마다 스냅샷을 JSON 줄로 추가
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9358
+METRICS_DUMP_PATH = None
+METRICS_DUMP_INTERVAL = 30
+metrics = Metrics()
 RECYCLE_CENTER_ID = 1
 PYQT_IP = "192.168.0.31"
 PYQT_PORT = 6000
 pyqt_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
-# queue 사이즈
-frame_queue = queue.Queue(maxsize=8)
+# 카메라 프레임 수신 포트 (UDP)
+RECEIVER_PORT = 1234
+
+# 마이크로 배치 추론 (BATCH_SIZE = 1 이면 프레임 단위 처리)
+# → 최대 BATCH_SIZE 프레임을 모으거나 BATCH_WAIT_MS 가 지나면 한 번에 추론
+BATCH_SIZE = 1
+BATCH_WAIT_MS = 30
+THROUGHPUT_LOG_INTERVAL = 30
+
+# 감지 ↔ 트래커 매칭 방식 ("hungarian" / "greedy")
+ASSOCIATION_METHOD = "hungarian"
+
+# 트래커 백엔드 ("KCF", "CSRT", "MOSSE", "KALMAN")
+# → 선택 기준은 bench_trackers.py 결과 참고
+TRACKER_BACKEND = "KCF"
+
+# 감지 주기: DETECT_INTERVAL 프레임마다 YOLO, 그 사이 프레임은 트래커로 박스 전파
+# ADAPTIVE_DETECT_INTERVAL = True 면 추론 시간과 세션별 frame_queue 깊이로 주기 자동 조정
+# (트랙이 없거나 유실되면 즉시 재감지)
+DETECT_INTERVAL = 1
+ADAPTIVE_DETECT_INTERVAL = False
+MAX_DETECT_INTERVAL = 6
+
+# 움직임 게이트: 추적 중인 객체가 없고 장면이 바뀌지 않았으면 YOLO 생략 (유휴 시간 CPU 절약)
+# MOTION_THRESHOLD: 바뀐 픽셀 비율 기준 (작을수록 민감), MOTION_PIXEL_DIFF: 픽셀 밝기 차이 기준
+MOTION_GATING = False
+MOTION_THRESHOLD = 0.01
+MOTION_PIXEL_DIFF = 25
+
+# 크롭 결과 캐시: keyframe 에서 추적 중인 모든 박스의 크롭이 최근 감지 결과와 거의 같으면
+# (같은 자리 + dHash 해밍 거리 <= CROP_CACHE_DISTANCE) YOLO 대신 캐시된 class / conf 사용
+# CROP_CACHE_TTL 초가 지난 항목은 다시 감지 (새로 들어온 물체를 놓치지 않도록 짧게 유지)
+CROP_CACHE = False
+CROP_CACHE_SIZE = 256
+CROP_CACHE_TTL = 2.0
+CROP_CACHE_DISTANCE = 4
+
+# 이물질 검사: 감지 박스의 Hue 히스토그램이 한 가지 색에 몰려 있으면 (L2 정규화 히스토그램의 표준편차 >
+# CONTAMINATION_STD_THRESHOLD) 그 감지는 원래 클래스 대신 "Contaminated" (일반쓰레기) 로 투표
+# 값 범위는 0 ~ 약 0.074 → 라인 조명 / 카메라마다 샘플로 보정해서 사용
+# 트래커 매칭 / 클래스 게이팅은 모델 클래스 그대로 (투표만 바뀜)
+CONTAMINATION_CHECK = False
+CONTAMINATION_STD_THRESHOLD = 0.05
+contamination_check = ContaminationCheck(threshold=CONTAMINATION_STD_THRESHOLD) if CONTAMINATION_CHECK else None
+# 결과 클래스 = 모델 클래스 + 이물질
+RESULT_CLASS_NAMES = {**CLASS_NAMES, CONTAMINATED_CLASS_ID: CONTAMINATED_CLASS_NAME}
+
+# 결과 결정 방식
+#   "window": 10초 윈도우 동안 투표 → 윈도우당 한 객체
+#   "early" : 트랙마다 투표가 충분히 쌓이면 바로 결정 (여러 객체 가능, 같은 트랙은 한 번만)
+#             → 트랙 클래스도 투표로 정하므로 감지 ↔ 트래커 매칭 시 클래스 게이팅 안 함
+DECISION_MODE = "window"
+DECISION_MIN_VOTES = 3
+DECISION_MIN_CONF = 0.6
+DECISION_MIN_SHARE = 0.7
+DECISION_MIN_EVIDENCE = 3.0
+# 결정된 트랙이 유실된 뒤 DECISION_COOLDOWN 초 안에 같은 클래스로 IoU >= DECISION_COOLDOWN_IOU 위치에서
+# 결정되는 새 트랙은 같은 물체로 보고 전송하지 않음 (가림 / 손으로 놓는 중 트래커 실패 → 새 트랙)
+DECISION_COOLDOWN = 2.0
+DECISION_COOLDOWN_IOU = 0.3
+
+# 수신 후 FRAME_DEADLINE_MS 가 지난 프레임은 추론하지 않고 폐기
+FRAME_DEADLINE_MS = 500
+
+# queue 사이즈 (세션별 frame_queue 는 가득 차면 가장 오래된 프레임을 덮어쓰는 링 버퍼)
+# → 수신 스레드는 압축된 JPEG 바이트만 넣고, 디코딩은 추론할 프레임에만 수행
+FRAME_QUEUE_SIZE = 8
+# 청크 전송 프레임 재조립 (MAX_FRAME_BYTES 까지, REASSEMBLY_TIMEOUT_MS 내에 완성 안 되면 폐기)
+MAX_FRAME_BYTES = 1 << 20
+REASSEMBLY_TIMEOUT_MS = 500
+frame_pool = BufferPool(count=BATCH_SIZE + 4, size=MAX_FRAME_BYTES)
 result_queue = queue.Queue(maxsize=5)
 
+# 카메라(소스)별 세션 라우팅: source_id → (deepcycle_center_id, PyQt UI IP)
+# 등록되지 않은 소스는 RECYCLE_CENTER_ID 로 저장하고, 프레임을 보낸 클라이언트 IP 로 결과 전송
+# (청크 헤더가 없는 이전 방식 클라이언트는 source_id = 0)
+SOURCE_ROUTES = {
+    1: (RECYCLE_CENTER_ID, PYQT_IP),
+}
+# 카메라별 투입구 ROI: source_id → (x1, y1, x2, y2) 수신 프레임 좌표
+# ROI 만 잘라서 (덮을 수 있는 가장 작은 입력 크기로) 추론, 결과 박스는 전체 프레임 좌표로 되돌림
+# 등록되지 않은 소스는 전체 프레임 추론
+SOURCE_ROIS = {}
+# 세션 간 detector 공유 방식 ("round_robin" / "deadline")
+SESSION_SCHEDULING = "round_robin"
+# 이 시간(초) 동안 프레임이 없는 세션은 정리
+SESSION_IDLE_TIMEOUT = 300
+
+
+def create_session(source_key):
+    client_ip, source_id = source_key
+    center_id, ui_ip = SOURCE_ROUTES.get(source_id, (RECYCLE_CENTER_ID, client_ip))
+    frame_pool.grow(FRAME_QUEUE_SIZE)
+    return Session(
+        source_key, center_id, (ui_ip, PYQT_PORT),
+        roi=SOURCE_ROIS.get(source_id),
+        frame_queue=FrameRingBuffer(capacity=FRAME_QUEUE_SIZE, on_drop=lambda item: frame_pool.release(item[0])),
+        tracks=create_tracker_backend(TRACKER_BACKEND),
+        scheduler=DetectionScheduler(
+            interval=DETECT_INTERVAL,
+            adaptive=ADAPTIVE_DETECT_INTERVAL,
+            max_interval=MAX_DETECT_INTERVAL,
+            queue_capacity=FRAME_QUEUE_SIZE
+        ),
+        decisions=DecisionEngine(
+            min_votes=DECISION_MIN_VOTES,
+            min_conf=DECISION_MIN_CONF,
+            min_share=DECISION_MIN_SHARE,
+            min_evidence=DECISION_MIN_EVIDENCE,
+            cooldown=DECISION_COOLDOWN,
+            cooldown_iou=DECISION_COOLDOWN_IOU
+        ) if DECISION_MODE == "early" else None,
+        motion_gate=MotionGate(
+            threshold=MOTION_THRESHOLD,
+            pixel_diff=MOTION_PIXEL_DIFF
+        ) if MOTION_GATING else None,
+        crop_cache=CropCache(
+            max_size=CROP_CACHE_SIZE,
+            ttl=CROP_CACHE_TTL,
+            max_distance=CROP_CACHE_DISTANCE
+        ) if CROP_CACHE else None,
+        votes=VoteAggregator(num_classes=len(RESULT_CLASS_NAMES))
+    )
+
+
+session_manager = SessionManager(create_session, policy=SESSION_SCHEDULING)
+
 # 재매핑 
 YOLO_CLASS_TO_SERVER_ID = {
     "Paper": 1, "Paper Pack": 1, "Paper Cup": 1,
@@ -43,7 +290,8 @@ YOLO_CLASS_TO_SERVER_ID = {
     "Glass & Multi-layer Packaging": 6,
     "PET & Multi-layer Packaging": 6,
     "Styrofoam": 6,
-    "Battery": 7
+    "Battery": 7,
+    "Contaminated": 6
 }
 
 
@@ -55,122 +303,451 @@ shutdown_event = threading.Event()
 class FrameReceiverThread(threading.Thread):
     def __init__(self):
         super().__init__(name="FrameReceiver")
+        self.reassembler = FrameReassembler(frame_pool, timeout=REASSEMBLY_TIMEOUT_MS / 1000)
+
+    def collect_metrics(self):
+        # 재조립 단계 손실 (카메라별 누적값 합계)
+        stats = list(self.reassembler.stats.values())
+        return {
+            "frames_incomplete_total": sum(s.frames_dropped for s in stats),
+            "frames_missing_total": sum(s.frames_missing for s in stats),
+            "chunks_lost_total": sum(s.chunks_lost for s in stats),
+        }
 
     def run(self):
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.bind(("0.0.0.0", 1234))
+        sock.bind(("0.0.0.0", RECEIVER_PORT))
+        sock.settimeout(0.1)
         print("[🔵] FrameReceiver 시작됨")
+
+        # 데이터그램은 고정 버퍼 하나로 받고, 프레임 단위로만 풀 버퍼에 복사
+        packet_buf = bytearray(65536)
+        packet_view = memoryview(packet_buf)
+        reassembler = self.reassembler
+        last_stats_time = time.time()
+
         while not shutdown_event.is_set():
+            now = time.time()
+            reassembler.expire(now)
+            if now - last_stats_time >= THROUGHPUT_LOG_INTERVAL:
+                for source_key, stats in reassembler.stats.items():
+                    print(f"[📊] 카메라 {source_key}: {stats.summary()}")
+                last_stats_time = now
+
             try:
-                data, _ = sock.recvfrom(65536)
-                frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
-                if frame is not None:
-                    try:
-                        frame_queue.put(frame, timeout=1)
-                    except queue.Full:
-                        # print("[⚠️] 프레임 버퍼 가득 참 - 드롭됨")
-                        pass
+                nbytes, addr = sock.recvfrom_into(packet_buf)
+            except socket.timeout:
+                continue
             except Exception as e:
                 print(f"[❌] FrameReceiver 오류: {e}")
+                continue
+
+            if nbytes == 0:
+                continue
+            recv_time = time.time()
+            packet = packet_view[:nbytes]
+
+            if is_chunk_packet(packet):
+                completed = reassembler.add(packet, addr, recv_time)
+                if completed is None:
+                    continue
+                buf, frame_bytes, source_key, _, first_arrival = completed
+                # 첫 청크 도착 → 마지막 청크 도착 (재조립 대기)
+                metrics.observe("receive", recv_time - first_arrival)
+                recv_time = first_arrival
+            else:
+                # 이전 방식 (데이터그램 하나 = JPEG 한 장)
+                buf = frame_pool.acquire()
+                buf[:nbytes] = packet
+                frame_bytes = nbytes
+                source_key = (addr[0], 0)
+
+            metrics.inc("frames_received")
+            session_manager.put(source_key, (buf, frame_bytes), recv_time)
 
 
 # ========== Thread 2: YOLO 감지 + Tracker ==========
 class InferenceThread(threading.Thread):
     def __init__(self):
         super().__init__(name="InferenceThread")
-        self.trackers = {}
-        self.buffer = []
-
-        self.next_tracker_id = 0
         self.iou_threshold = 0.5
         
         # YOLO 재검증 주기 / Tracker 유지 시간 
         self.timeout = 10
         self.duration = 10
-        
-        self.start_time = time.time()
 
+        # 결과 결정 지연 (객체 첫 감지 → 결과 전송, 초)
+        self.decision_latencies = []
+        self.first_frame_logged = False
+        self.first_result_logged = False
+        # 열린 투표 윈도우를 기다리지 않고 바로 결정 (벤치마크 종료 시 등) → 처리 후 flushed 설정
+        self.flush_requested = threading.Event()
+        self.flushed = threading.Event()
 
-    def aggregate_and_send(self):
-        if not self.buffer:
-            return
-        
-        # Step 1: conf >= 0.5 필터링
-        filtered = [(cls_id, conf, box, frame) for cls_id, conf, box, frame in self.buffer if conf >= 0.5]
-        if not filtered:
-            return
-        # Step 2: 클래스별로 그룹화
-        stat = {}
-        for class_id, conf, box, frame in filtered:
-            stat.setdefault(class_id, []).append((conf, box, frame))
-        # Step 3: 가장 많이 나온 클래스 중 선택
-        #  → 빈도수가 같은 경우, 평균 conf 기준으로 선택
-        best_class_id = max(
-            stat.items(),
-            key=lambda x: (len(x[1]), np.mean([conf for conf, _, _ in x[1]]))
-        )[0]
-        
-        # Step 4: 그 클래스 중 conf가 가장 높은 항목 선택
-        best_conf, best_box, best_frame = max(stat[best_class_id], key=lambda x: x[0])
-        frame_to_send = draw_box_on_frame(
-            best_frame, best_box, f"{CLASS_NAMES.get(best_class_id, 'Unknown')} ({best_conf:.2f})"
-        ) if SEND_TRAINING_DATA else best_frame
 
-        # Step 5: 전송
+    def aggregate_and_send(self, session):
+        # 가장 많이 나온 클래스 중 conf 가 가장 높은 후보 (누적 통계에서 바로 선택)
+        with metrics.time("vote"):
+            winner = session.votes.winner()
+        if winner is None:
+            return
+        best_class_id, best_conf, best_box, best_frame, first_seen, recv_time = winner
+        self.emit_result(session, best_class_id, best_conf, best_box, best_frame, time.time() - first_seen, recv_time)
+
+    def emit_result(self, session, class_id, conf, box, frame, decision_latency, recv_time=None):
+        self.decision_latencies.append(decision_latency)
+        metrics.observe("decision", decision_latency)
+        if recv_time is not None:
+            # 결과로 뽑힌 프레임의 수신 → 결과 결정 (윈도우 모드는 윈도우 대기 시간 포함)
+            metrics.observe("result", time.time() - recv_time)
+        if not self.first_result_logged:
+            self.first_result_logged = True
+            print(f"[⏱] 첫 결과: 서버 시작 후 {time.time() - START_TIME:.1f} s")
+
+        # 전송 (세션의 센터 / UI 로 라우팅, 박스 그리기는 업로드 직전에 필요할 때만)
         result = {
-            "frame": frame_to_send,
-            "class_id": best_class_id,
-            "box": best_box,
-            "conf": best_conf
+            "frame": frame,
+            "class_id": class_id,
+            "box": box,
+            "conf": conf,
+            "center_id": session.center_id,
+            "ui_addr": session.ui_addr
         }
 
         try:
             result_queue.put(result, timeout=1)
         except queue.Full:
+            metrics.inc("results_dropped")
             print("[⚠️] result_queue 가득 참 - 결과 드롭")
 
-    def run(self):
-        print("[🟡] InferenceThread 시작됨")
-        while not shutdown_event.is_set():
+    def next_frame(self, timeout):
+        """
+        세션 스케줄러에서 유효한 프레임을 꺼내 디코딩 (추론할 프레임만 디코딩)
+        :return: (session, frame, recv_time)
+        """
+        while True:
+            session, (buf, nbytes), recv_time = session_manager.get(timeout=timeout, max_age=FRAME_DEADLINE_MS / 1000)
+            metrics.observe("queue", time.time() - recv_time)
+            try:
+                with metrics.time("decode"):
+                    keep_jpeg = (UPLOAD_RESULTS and UPLOAD_PAYLOAD == "full" and not UPLOAD_ANNOTATED) \
+                        or EXPORT_DATASET
+                    frame = decode_image(buf, nbytes, keep_jpeg=keep_jpeg)
+            finally:
+                frame_pool.release(buf)
+            if frame is not None:
+                return session, frame, recv_time
+            metrics.inc("decode_failures")
+
+    def collect_batch(self):
+        # 여러 세션의 프레임을 한 배치로 모아 detector 한 번 호출로 처리
+        try:
+            batch = [self.next_frame(timeout=1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.time() + BATCH_WAIT_MS / 1000
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
             try:
-                frame = frame_queue.get(timeout=1)
+                batch.append(self.next_frame(timeout=remaining))
             except queue.Empty:
-                continue
-
-            current_time = time.time()
-            boxes, class_ids, confs = detector.detect_all(frame)
+                break
+        return batch
+
+    def process_detections(self, session, frame, dets, predicted=None, fresh=True, recv_time=None):
+        # fresh=False: 크롭 캐시에서 온 감지 → 트랙 유지만 하고 새 투표 근거로는 쓰지 않음
+        # (tracking 지연에는 이 안에서 하는 투표 시간도 포함)
+        start = time.perf_counter()
+        current_time = time.time()
+
+        # 학습 데이터는 CONF_THRESHOLD 로 거르기 전 감지 그대로 (낮은 conf 감지가 있는 프레임을 exporter 가 건너뛰도록)
+        if dataset_exporter is not None and fresh and len(dets):
+            dataset_exporter.submit(frame, dets, session.source_key, roi=session.roi)
+        dets = dets.filter(CONF_THRESHOLD)
+        # 투표에 쓸 감지 (이물질 검사에 걸린 감지만 CONTAMINATED_CLASS_ID 로)
+        vote_dets = dets
+        if contamination_check is not None and fresh and len(dets):
+            with metrics.time("contamination"):
+                vote_dets = contamination_check.reroute(dets)
+
+        # Step 1: 트래커는 프레임당 한 번만 업데이트 (coast 단계에서 이미 전진했으면 재사용)
+        if predicted is None:
+            predicted = session.tracks.predict(frame)
+            self.drop_lost_tracks(session, predicted[0])
+        track_ids, track_boxes = predicted
+        track_class_ids = [session.trackers[tracker_id][0] for tracker_id in track_ids]
+
+        # Step 2: IOU 행렬 기반 매칭 (조기 결정 모드가 아니면 클래스가 같은 쌍만)
+        decisions = session.decisions
+        matches, unmatched_dets, _ = associate(
+            dets.boxes, dets.class_ids, track_boxes, track_class_ids,
+            iou_threshold=self.iou_threshold, method=ASSOCIATION_METHOD,
+            class_gating=decisions is None
+        )
+
+        for det_idx, trk_idx in matches:
+            tracker_id = track_ids[trk_idx]
+            class_id, _ = session.trackers[tracker_id]
+            if decisions is not None and fresh:
+                self.vote(session, tracker_id, vote_dets, det_idx, frame, current_time, recv_time)
+                class_id = decisions.leader(tracker_id)
+            session.trackers[tracker_id] = (class_id, current_time)
+        session.tracks.correct(
+            [track_ids[trk_idx] for _, trk_idx in matches],
+            dets.boxes[[det_idx for det_idx, _ in matches]]
+        )
+
+        # 캐시 감지가 트랙과 맞지 않으면 (캐시 클래스가 그 사이 바뀐 경우 등) 새 트랙 / 투표 없이
+        # 다음 프레임에 YOLO 로 다시 확인
+        stale = not fresh and bool(unmatched_dets)
+        if not fresh:
+            unmatched_dets = []
+
+        # Step 3: 매칭 안 된 감지 → 새 객체
+        for det_idx in unmatched_dets:
+            tracker_id = session.next_tracker_id
+            session.tracks.add(tracker_id, frame, dets.boxes[det_idx])
+            session.trackers[tracker_id] = (int(dets.class_ids[det_idx]), current_time)
+            session.next_tracker_id += 1
+            if decisions is not None:
+                self.vote(session, tracker_id, vote_dets, det_idx, frame, current_time, recv_time)
+            # print(f"[🟢] 새 객체 감지")
+        if decisions is None and unmatched_dets:
+            with metrics.time("vote"):
+                session.votes.add(vote_dets[unmatched_dets], current_time, recv_time)
+
+        for tracker_id in list(session.trackers.keys()):
+            _, last_seen = session.trackers[tracker_id]
+            if current_time - last_seen > self.timeout:
+                self.remove_track(session, tracker_id)
+
+        session.tracks_lost = not session.trackers or stale
+        metrics.observe("tracking", time.perf_counter() - start)
+
+    def vote(self, session, tracker_id, dets, det_idx, frame, current_time, recv_time=None):
+        with metrics.time("vote"):
+            decision = session.decisions.vote(
+                tracker_id, int(dets.class_ids[det_idx]), float(dets.confs[det_idx]),
+                dets.boxes[det_idx].tolist(), frame, current_time, recv_time
+            )
+        if decision is not None:
+            self.emit_result(session, *decision)
+
+    def motion_gated(self, session, frame, recv_time):
+        if session.motion_gate is None:
+            return False
+        if session.motion_gate.should_skip(frame, tracking=bool(session.trackers)):
+            metrics.inc("frames_gated")
+            return True
+        return False
+
+    def cached_detections(self, session, frame, predicted):
+        """
+        추적 중인 박스 크롭이 모두 캐시에 있으면 YOLO 없이 Detections 구성
+        :return: Detections 또는 None (하나라도 miss 면 감지 필요)
+        """
+        track_ids, track_boxes = predicted
+        if not len(track_ids) or len(track_ids) < len(session.trackers):
+            return None
+        now = time.time()
+        hits = []
+        for box in track_boxes:
+            hit = session.crop_cache.lookup(frame, box, now)
+            if hit is None:
+                return None
+            hits.append(hit)
+        if session.scheduler.latency is not None:
+            session.crop_cache.record_saved(session.scheduler.latency)
+        data = np.empty((len(hits), 6), dtype=np.float32)
+        data[:, :4] = track_boxes
+        data[:, 4] = [conf for _, conf in hits]
+        data[:, 5] = [class_id for class_id, _ in hits]
+        return Detections.from_array(data, frame)
+
+    def fill_cache(self, session, frame, dets):
+        now = time.time()
+        dets = dets.filter(CONF_THRESHOLD)
+        for box, class_id, conf in zip(dets.boxes, dets.class_ids, dets.confs):
+            session.crop_cache.put(frame, box, int(class_id), float(conf), now)
+
+    def remove_track(self, session, tracker_id):
+        session.trackers.pop(tracker_id, None)
+        session.tracks.remove(tracker_id)
+        if session.decisions is not None:
+            session.decisions.remove(tracker_id)
+
+    def drop_lost_tracks(self, session, track_ids):
+        """
+        백엔드가 놓친 트랙 (predict 결과에 없는 트랙) 을 타임아웃까지 기다리지 않고 바로 정리
+        (남겨 두면 매 프레임 유실로 보여 그동안 계속 강제 재감지됨)
+        :return: 정리한 트랙 수
+        """
+        if len(track_ids) == len(session.trackers):
+            return 0
+        alive = set(track_ids)
+        lost = [tracker_id for tracker_id in session.trackers if tracker_id not in alive]
+        for tracker_id in lost:
+            self.remove_track(session, tracker_id)
+        return len(lost)
+
+    def coast(self, session, frame):
+        """
+        감지 없이 트래커만 한 프레임 전진
+        :return: predicted - 트랙이 없거나 이번 프레임에 유실되면 session.tracks_lost = True (즉시 재감지 필요)
+        """
+        with metrics.time("tracking"):
+            predicted = session.tracks.predict(frame)
+            lost = self.drop_lost_tracks(session, predicted[0])
+        session.tracks_lost = not session.trackers or lost > 0
+        return predicted
+
+    def detect_timed(self, sessions, frames):
+        start = time.time()
+        try:
+            if len(frames) == 1:
+                results = [detector.detect_all(frames[0], roi=sessions[0].roi)]
+            else:
+                results = detector.detect_batch(frames, rois=[session.roi for session in sessions])
+        except Exception as e:
+            # 추론 실패로 추론 스레드가 죽지 않도록 이 배치만 감지 없음으로 처리
+            print(f"[❌] 추론 실패 ({len(frames)} 프레임 감지 없음으로 처리): {e}")
+            metrics.inc("inference_errors")
+            results = [Detections.empty(frame) for frame in frames]
+        latency = time.time() - start
+        metrics.observe("inference", latency)
+        metrics.inc("inference_frames", len(frames))
+        for session in set(sessions):
+            session.scheduler.record_latency(latency, len(frames))
+        return results
+
+    def log_throughput(self, num_frames, num_batches, latencies):
+        now = time.time()
+        elapsed = now - self.throughput_start
+        if elapsed < THROUGHPUT_LOG_INTERVAL:
+            return False
+        fps = num_frames / elapsed
+        avg_batch = num_frames / num_batches if num_batches else 0
+        sessions = session_manager.all()
+        print(f"[📊] 추론 처리량: {fps:.1f} fps (BATCH_SIZE={BATCH_SIZE}, 평균 배치 {avg_batch:.1f}, 세션 {len(sessions)})")
+        for session in sessions:
+            print(f"[📊]   {session}: 감지 비율 {session.scheduler.detect_ratio:.2f} (주기 {session.scheduler.interval}), "
+                  f"덮어쓴 프레임 {session.frame_queue.overwritten}, 만료 프레임 {session.frame_queue.expired}")
+            session.scheduler.reset_stats()
+            if session.motion_gate is not None:
+                print(f"[📊]   {session}: 움직임 게이트 생략 {session.motion_gate.gated} / 통과 {session.motion_gate.passed}")
+                session.motion_gate.reset_stats()
+            if session.crop_cache is not None:
+                cache = session.crop_cache
+                print(f"[📊]   {session}: 크롭 캐시 적중률 {cache.hit_rate:.2f} ({cache.hits}/{cache.hits + cache.misses}), "
+                      f"항목 {len(cache.entries)}, 제거 {cache.evictions}, 절약한 추론 {cache.saved_time:.1f} s")
+                cache.reset_stats()
+        if latencies:
+            print(f"[📊] 수신→처리 지연: 평균 {np.mean(latencies) * 1000:.0f} ms, 최대 {max(latencies) * 1000:.0f} ms | "
+                  f"버퍼 풀 추가 할당 {frame_pool.misses}")
+        if self.decision_latencies:
+            p50, p95 = np.percentile(self.decision_latencies, [50, 95])
+            print(f"[📊] 결정 지연 ({DECISION_MODE}): p50 {p50:.2f} s, p95 {p95:.2f} s, 결정 {len(self.decision_latencies)}건")
+            self.decision_latencies = []
+        if uploader is not None:
+            print(f"[📊] {uploader.stats()}")
+        for session in session_manager.remove_idle(SESSION_IDLE_TIMEOUT, now):
+            print(f"[🗑️] 유휴 세션 정리: {session}")
+        self.throughput_start = now
+        return True
 
-            for box, class_id, conf in zip(boxes, class_ids, confs):
-                if conf < CONF_THRESHOLD:
-                    continue
+    def run(self):
+        print("[🟡] InferenceThread 시작됨")
+        # 모델이 준비될 때까지 대기 (그동안 수신된 프레임은 세션 링 버퍼에 최신 것만 남음)
+        while not detector_ready.wait(timeout=0.5):
+            if shutdown_event.is_set():
+                return
+        num_frames = 0
+        num_batches = 0
+        latencies = []
+        self.throughput_start = time.time()
 
-                matched = False
-                for tracker_id, (tracker, t_class_id, last_seen) in list(self.trackers.items()):
-                    success, tracked_box = tracker.update(frame)
-                    if not success or t_class_id != class_id:
+        while not shutdown_event.is_set():
+            batch = self.collect_batch()
+            # 움직임 없는 장면은 감지 / 추적 모두 생략
+            batch = [item for item in batch if not self.motion_gated(*item)]
+
+            if batch:
+                # keyframe 선정 → 모든 세션의 keyframe 을 모아서 한 번에 감지
+                for session in {session for session, _, _ in batch}:
+                    session.scheduler.update_interval(session.frame_queue.qsize())
+                forced = set()
+                is_keyframe = []
+                for session, _, _ in batch:
+                    force = session.tracks_lost and session not in forced
+                    forced.add(session)
+                    is_keyframe.append(session.scheduler.should_detect(force=force))
+                # 크롭 캐시는 배치 안에서 세션의 첫 프레임에만 적용 (트래커 전진 순서 유지)
+                predicted = [None] * len(batch)
+                cached = [None] * len(batch)
+                checked = set()
+                for i, ((session, frame, _), key) in enumerate(zip(batch, is_keyframe)):
+                    first = session not in checked
+                    checked.add(session)
+                    if key and first and session.crop_cache is not None and session.trackers:
+                        predicted[i] = session.tracks.predict(frame)
+                        # 이번 프레임에 놓친 트랙이 있으면 캐시 대신 감지
+                        if not self.drop_lost_tracks(session, predicted[i][0]):
+                            cached[i] = self.cached_detections(session, frame, predicted[i])
+                keyed = [(session, frame) for (session, frame, _), key, hit in zip(batch, is_keyframe, cached)
+                         if key and hit is None]
+                results = iter(self.detect_timed(*zip(*keyed))) if keyed else iter(())
+
+                for (session, frame, recv_time), key, tracks, hit in zip(batch, is_keyframe, predicted, cached):
+                    if key:
+                        dets = hit if hit is not None else next(results)
+                        self.process_detections(session, frame, dets, predicted=tracks, fresh=hit is None,
+                                                recv_time=recv_time)
+                        if hit is None and session.crop_cache is not None:
+                            self.fill_cache(session, frame, dets)
                         continue
-                    if iou(box, tracked_box) >= self.iou_threshold:
-                        self.trackers[tracker_id] = (tracker, class_id, current_time)
-                        matched = True
-                        break
-
-                if not matched:
-                    tracker = create_tracker()
-                    tracker.init(frame, tuple(box))
-                    self.trackers[self.next_tracker_id] = (tracker, class_id, current_time)
-                    self.next_tracker_id += 1
-                    self.buffer.append((class_id, conf, box, frame))
-                    # print(f"[🟢] 새 객체 감지")
-
-            for tracker_id in list(self.trackers.keys()):
-                _, _, last_seen = self.trackers[tracker_id]
-                if current_time - last_seen > self.timeout:
-                    del self.trackers[tracker_id]
-
-            if time.time() - self.start_time >= self.duration:
-                self.aggregate_and_send()
-                self.buffer.clear()
-                self.start_time = time.time()
+                    coasted = self.coast(session, frame)
+                    if session.tracks_lost:
+                        # 트랙 유실 → keyframe 을 기다리지 않고 즉시 재감지
+                        session.scheduler.mark_detected()
+                        self.process_detections(session, frame, self.detect_timed([session], [frame])[0],
+                                                predicted=coasted, recv_time=recv_time)
+
+                done_time = time.time()
+                if not self.first_frame_logged:
+                    self.first_frame_logged = True
+                    print(f"[⏱] 첫 프레임 처리: 서버 시작 후 {done_time - START_TIME:.1f} s")
+                latencies.extend(done_time - recv_time for _, _, recv_time in batch)
+                for _, _, recv_time in batch:
+                    metrics.observe("pipeline", done_time - recv_time)
+                num_frames += len(batch)
+                num_batches += 1
+
+            if self.log_throughput(num_frames, num_batches, latencies):
+                num_frames = 0
+                num_batches = 0
+                latencies = []
+
+            # 세션별 투표 윈도우 (조기 결정 모드는 트랙 단위로 이미 전송)
+            flush = self.flush_requested.is_set()
+            for session in session_manager.all():
+                if session.decisions is None and (flush or time.time() - session.start_time >= self.duration):
+                    self.aggregate_and_send(session)
+                    session.votes.reset()
+                    session.start_time = time.time()
+            if flush:
+                self.flush_requested.clear()
+                self.flushed.set()
+
+    def flush_votes(self, timeout=5.0):
+        """
+        다른 스레드에서 호출: 열린 투표 윈도우를 바로 결정하도록 요청하고 처리될 때까지 대기
+        """
+        self.flushed.clear()
+        self.flush_requested.set()
+        return self.flushed.wait(timeout)
 
 # ========== Thread 3: 결과 전송 (Flask + PyQt) ==========
 class ResultSenderThread(threading.Thread):
@@ -189,7 +766,7 @@ class ResultSenderThread(threading.Thread):
             class_id = result["class_id"]
             box = result["box"]
             conf = result["conf"]
-            class_name = CLASS_NAMES.get(class_id, "Unknown")
+            class_name = RESULT_CLASS_NAMES.get(class_id, "Unknown")
 
             try:
                 packet = {
@@ -198,32 +775,114 @@ class ResultSenderThread(threading.Thread):
                     "box": list(map(int, box)),
                     "timestamp": time.time()
                 }
-                pyqt_sock.sendto(json.dumps(packet).encode(), (PYQT_IP, PYQT_PORT))
+                pyqt_sock.sendto(json.dumps(packet).encode(), result["ui_addr"])
+                metrics.inc("results_notified")
                 print(f"[📡] PyQt 전송 → {class_name}")
             except Exception as e:
+                metrics.inc("notify_failures")
                 print(f"[⚠️] PyQt 전송 실패: {e}")
 
-            frame_to_send = draw_box_on_frame(frame, box, f"{class_name} ({conf:.2f})") if SEND_TRAINING_DATA else frame
-            image_b64 = encode_image_to_base64(frame)
             server_class_id = YOLO_CLASS_TO_SERVER_ID.get(class_name, -1)
-
-            if image_b64 and server_class_id != -1:
-                data = {
-                    "deepcycle_center_id": RECYCLE_CENTER_ID,
-                    "image": image_b64,
-                    "extension": "jpg",
-                    "confidence": conf,
-                    "class": server_class_id,
-                    "box": list(map(int, box))
-                }
-                try:
-                    response = requests.post(TCP_SERVER_URL, json=data)
-                    if response.status_code == 200:
-                        print(f"Flask 응답: {response.json()}")
-                    else:
-                        print(f"⚠️ Flask 오류: {response.status_code} - {response.text}")
-                except Exception as e:
-                    print(f"[❌] Flask 전송 실패: {e}")
+            if not UPLOAD_RESULTS or server_class_id == -1:
+                continue
+            with metrics.time("encode"):
+                image, (dx, dy, scale) = upload_image_bytes(frame, box, f"{class_name} ({conf:.2f})")
+            if image is None:
+                continue
+            metrics.inc("upload_bytes", len(image))
+
+            # 업로드는 Uploader 워커가 비동기로 (PyQt 알림은 위에서 이미 전송, 업로드를 기다리지 않음)
+            uploader.submit({
+                "deepcycle_center_id": result["center_id"],
+                "extension": "jpg",
+                "confidence": conf,
+                "class": server_class_id,
+                "box": list(map(int, box)),
+                "crop_offset": [dx, dy],
+                "image_scale": round(scale, 6)
+            }, image)
+
+
+def collect_pipeline_metrics():
+    # 조회 시점의 큐 깊이 + 세션 / 버퍼 / 업로더가 이미 세고 있는 누적 카운터
+    sessions = session_manager.all()
+    values = {
+        "sessions": len(sessions),
+        "frame_queue_depth": sum(s.frame_queue.qsize() for s in sessions),
+        "result_queue_depth": result_queue.qsize(),
+        "frames_overwritten_total": sum(s.frame_queue.overwritten for s in sessions),
+        "frames_expired_total": sum(s.frame_queue.expired for s in sessions),
+        "frame_pool_misses_total": frame_pool.misses,
+        "decisions_suppressed_total": sum(s.decisions.suppressed for s in sessions if s.decisions is not None),
+    }
+    # 세션별 (source 라벨) 감지 비율 / 크롭 캐시 - 로그용 구간 통계와 달리 초기화하지 않는 누적값
+    for session in sessions:
+        client_ip, source_id = session.source_key
+        label = f'{{source="{client_ip}:{source_id}"}}'
+        scheduler = session.scheduler
+        values.update({
+            f"session_frames_total{label}": scheduler.cumulative_frames,
+            f"session_detected_frames_total{label}": scheduler.cumulative_detected,
+            f"session_detect_ratio{label}":
+                scheduler.cumulative_detected / scheduler.cumulative_frames if scheduler.cumulative_frames else 0.0,
+            f"session_detect_interval{label}": scheduler.interval,
+        })
+        cache = session.crop_cache
+        if cache is not None:
+            lookups = cache.cumulative_hits + cache.cumulative_misses
+            values.update({
+                f"crop_cache_hits_total{label}": cache.cumulative_hits,
+                f"crop_cache_misses_total{label}": cache.cumulative_misses,
+                f"crop_cache_evictions_total{label}": cache.cumulative_evictions,
+                f"crop_cache_saved_seconds_total{label}": round(cache.cumulative_saved_time, 3),
+                f"crop_cache_hit_rate{label}": cache.cumulative_hits / lookups if lookups else 0.0,
+                f"crop_cache_entries{label}": len(cache.entries),
+            })
+    if uploader is not None:
+        values.update({
+            "upload_queue_depth": uploader.pending.qsize(),
+            "uploads_sent_total": uploader.sent,
+            "uploads_rejected_total": uploader.rejected,
+            "uploads_retried_total": uploader.retried,
+            "uploads_spooled_total": uploader.spooled,
+            "uploads_replayed_total": uploader.replayed,
+            "uploads_dead_lettered_total": uploader.dead_lettered,
+            "upload_server_down": int(uploader.server_down.is_set()),
+        })
+    if isinstance(detector, InferenceWorkerPool):
+        values.update({
+            "inference_worker_restarts_total": detector.restarts,
+            "inference_worker_failed_frames_total": detector.failed_frames,
+        })
+    if dataset_exporter is not None:
+        values.update({f"export_{name}_total": value for name, value in dataset_exporter.stats().items()})
+    return values
+
+
+def upload_image_bytes(frame, box, label=None):
+    """
+    UPLOAD_PAYLOAD 에 따라 업로드할 JPEG 구성
+    :return: (JPEG 바이트 또는 None, (dx, dy, scale)) - 이미지 좌표 = (프레임 좌표 - (dx, dy)) * scale
+    """
+    # 원본 JPEG 가 있으면 재인코딩 / 프레임 복사 없이 그대로 (화질 손실 없음)
+    jpeg = getattr(frame, "jpeg", None)
+    if jpeg is not None and UPLOAD_PAYLOAD == "full" and not UPLOAD_ANNOTATED:
+        return jpeg, (0, 0, 1.0)
+
+    dx, dy, scale = 0, 0, 1.0
+    if UPLOAD_PAYLOAD == "crop":
+        frame, (dx, dy) = crop_roi(frame, pad_box(box, UPLOAD_CROP_PADDING, frame.shape))
+    elif UPLOAD_PAYLOAD == "downscale":
+        h, w = frame.shape[:2]
+        if max(h, w) > UPLOAD_MAX_SIDE:
+            scale = UPLOAD_MAX_SIDE / max(h, w)
+            frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    if UPLOAD_ANNOTATED:
+        x1, y1, x2, y2 = box
+        image_box = ((x1 - dx) * scale, (y1 - dy) * scale, (x2 - dx) * scale, (y2 - dy) * scale)
+        frame = draw_box_on_frame(frame, image_box, label)
+    ret, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, UPLOAD_JPEG_QUALITY])
+    return (buffer.tobytes() if ret else None), (dx, dy, scale)
 
 
 def draw_box_on_frame(frame, box, label=None):
@@ -244,7 +903,38 @@ signal.signal(signal.SIGINT, signal_handler)
 
 # ========== 스레드 실행 ==========
 if __name__ == "__main__":
-    FrameReceiverThread().start()
+    uploader = Uploader(
+        TCP_SERVER_BINARY_URL if UPLOAD_FORMAT == "binary" else TCP_SERVER_URL,
+        binary=UPLOAD_FORMAT == "binary",
+        max_in_flight=UPLOAD_MAX_IN_FLIGHT,
+        max_retries=UPLOAD_MAX_RETRIES,
+        spool_path=UPLOAD_SPOOL_PATH,
+        replay_interval=UPLOAD_REPLAY_INTERVAL,
+        max_attempts=UPLOAD_MAX_ATTEMPTS,
+        metrics=metrics
+    )
+    if EXPORT_DATASET:
+        dataset_exporter = DatasetExporter(
+            EXPORT_DIR,
+            shard_max_bytes=EXPORT_SHARD_MAX_MB << 20,
+            max_shards=EXPORT_MAX_SHARDS,
+            batch_size=EXPORT_BATCH_SIZE,
+            dedup_distance=EXPORT_DEDUP_DISTANCE,
+            min_conf=EXPORT_MIN_CONF,
+            max_pending=EXPORT_MAX_PENDING,
+            metrics=metrics
+        )
+
+    receiver = FrameReceiverThread()
+    metrics.add_collector(collect_pipeline_metrics)
+    metrics.add_collector(receiver.collect_metrics)
+    if METRICS_PORT is not None:
+        metrics.serve(METRICS_HOST, METRICS_PORT)
+    if METRICS_DUMP_PATH:
+        metrics.start_dump(METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL)
+
+    receiver.start()
+    threading.Thread(target=load_detector, name="ModelLoader", daemon=True).start()
     InferenceThread().start()
     ResultSenderThread().start()
 
@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+
+from vote_aggregator import VoteAggregator
+
+# ===============================
+# 카메라(소스) 세션: 소스마다 독립된 프레임 버퍼 / 트래커 / 감지 주기 / 투표 윈도우
+# ===============================
+class Session:
+    def __init__(self, source_key, center_id, ui_addr, frame_queue, tracks, scheduler, decisions=None,
+                 motion_gate=None, crop_cache=None, roi=None, votes=None):
+        self.source_key = source_key
+        self.center_id = center_id
+        self.ui_addr = ui_addr
+        # 추론 관심 영역 (x1, y1, x2, y2), None 이면 전체 프레임
+        self.roi = roi
+
+        self.frame_queue = frame_queue
+        self.scheduler = scheduler
+
+        # tracker_id → (class_id, last_seen), 박스 추적은 self.tracks 백엔드가 담당
+        self.tracks = tracks
+        self.trackers = {}
+        self.next_tracker_id = 0
+        self.tracks_lost = True
+
+        # 투표 윈도우 (클래스별 누적 통계만 유지)
+        self.votes = votes if votes is not None else VoteAggregator()
+        # 트랙 단위 조기 결정 (None 이면 윈도우 투표만 사용)
+        self.decisions = decisions
+        # 정적 장면 추론 생략 (None 이면 항상 추론)
+        self.motion_gate = motion_gate
+        # 크롭 단위 결과 캐시 (None 이면 keyframe 마다 항상 감지)
+        self.crop_cache = crop_cache
+        self.start_time = time.time()
+        self.last_active = time.time()
+
+    def __repr__(self):
+        return f"Session({self.source_key}, center={self.center_id})"
+
+
+# ===============================
+# 세션 관리 + 공정 스케줄링 (하나의 detector 를 여러 세션이 공유)
+#   "round_robin": 세션을 돌아가며 한 프레임씩
+#   "deadline"   : 가장 오래 기다린 프레임(수신 시각이 가장 이른)부터
+# ===============================
+class SessionManager:
+    def __init__(self, session_factory, policy="round_robin"):
+        if policy not in ("round_robin", "deadline"):
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.session_factory = session_factory
+        self.policy = policy
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.frame_ready = threading.Event()
+        self.rr_index = 0
+
+    def all(self):
+        with self.lock:
+            return list(self.sessions.values())
+
+    def get_or_create(self, source_key):
+        with self.lock:
+            session = self.sessions.get(source_key)
+            if session is None:
+                session = self.sessions[source_key] = self.session_factory(source_key)
+                print(f"[🆕] 세션 생성: {session}")
+            return session
+
+    def put(self, source_key, item, recv_time):
+        session = self.get_or_create(source_key)
+        session.last_active = recv_time
+        session.scheduler.record_arrival(recv_time)
+        session.frame_queue.put(item, recv_time)
+        self.frame_ready.set()
+
+    def _try_get(self, max_age):
+        sessions = self.all()
+        if not sessions:
+            return None
+
+        if self.policy == "deadline":
+            while True:
+                waiting = [(t, s) for s in sessions for t in [s.frame_queue.peek_time()] if t is not None]
+                if not waiting:
+                    return None
+                _, session = min(waiting, key=lambda x: x[0])
+                try:
+                    item, recv_time = session.frame_queue.get(timeout=0, max_age=max_age)
+                    return session, item, recv_time
+                except queue.Empty:
+                    continue
+
+        for i in range(len(sessions)):
+            session = sessions[(self.rr_index + i) % len(sessions)]
+            try:
+                item, recv_time = session.frame_queue.get(timeout=0, max_age=max_age)
+            except queue.Empty:
+                continue
+            self.rr_index = (self.rr_index + i + 1) % len(sessions)
+            return session, item, recv_time
+        return None
+
+    def get(self, timeout, max_age=None):
+        """
+        스케줄링 정책에 따라 다음 프레임을 꺼냄
+        :return: (session, item, recv_time)
+        :raises queue.Empty: timeout 내에 유효한 프레임이 없을 때
+        """
+        deadline = time.time() + timeout
+        while True:
+            # clear → 확인 → 대기 순서여야 put 알림을 놓치지 않음
+            self.frame_ready.clear()
+            picked = self._try_get(max_age)
+            if picked is not None:
+                return picked
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise queue.Empty
+            self.frame_ready.wait(remaining)
+
+    def remove_idle(self, idle_timeout, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            idle = [key for key, s in self.sessions.items()
+                    if now - s.last_active > idle_timeout and s.frame_queue.qsize() == 0 and s.votes.empty]
+            return [self.sessions.pop(key) for key in idle]
+
+    def queued_frames(self):
+        return sum(s.frame_queue.qsize() for s in self.all())
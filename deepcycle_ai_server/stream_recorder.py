@@ -0,0 +1,189 @@
+import argparse
+import glob
+import os
+import socket
+import struct
+import time
+
+import cv2
+
+from frame_transport import HEADER, fragment_frame, is_chunk_packet
+
+# ===============================
+# UDP 프레임 스트림 녹화 / 재생
+# 파일 형식: MAGIC + 레코드 반복 [도착 시각 오프셋(초, double), 길이(uint32)] + 데이터그램 그대로
+#
+# 사용 예)
+#   녹화   : python stream_recorder.py record --out line1.dcr --port 1234 --duration 60
+#            (AI 서버 대신 실행하거나, 클라이언트가 다른 포트로 보내게 해서 녹화)
+#   합성   : python stream_recorder.py synth --images ./samples --out samples.dcr --fps 15
+#   재생   : python stream_recorder.py replay line1.dcr --target 127.0.0.1:1234 --speed 2
+#            (--speed 1 원래 속도, 2 두 배 빠르게, 0 최대 속도)
+# ===============================
+MAGIC = b"DCREC\x01"
+RECORD = struct.Struct("!dI")
+
+
+def write_recording(path, packets):
+    """
+    :param packets: (도착 시각 오프셋, 데이터그램 바이트) iterable
+    :return: 기록한 데이터그램 수
+    """
+    count = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for offset, packet in packets:
+            f.write(RECORD.pack(offset, len(packet)))
+            f.write(packet)
+            count += 1
+    return count
+
+
+def read_recording(path):
+    """
+    :return: [(도착 시각 오프셋, 데이터그램 바이트), ...]
+    """
+    packets = []
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a frame stream recording: {path}")
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            offset, length = RECORD.unpack(header)
+            packet = f.read(length)
+            if len(packet) < length:
+                break
+            packets.append((offset, packet))
+    return packets
+
+
+def count_frames(packets):
+    # 청크 프레임은 (source_id, frame_seq) 당 한 장, 이전 방식 데이터그램은 한 개당 한 장
+    frames = set()
+    legacy = 0
+    for _, packet in packets:
+        if is_chunk_packet(packet):
+            _, _, _, source_id, frame_seq, _, _, _, _ = HEADER.unpack_from(packet)
+            frames.add((source_id, frame_seq))
+        else:
+            legacy += 1
+    return len(frames) + legacy
+
+
+def record(path, port, duration, host="0.0.0.0"):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    sock.settimeout(0.5)
+    buf = bytearray(65536)
+    start = None
+
+    def packets():
+        nonlocal start
+        deadline = time.time() + duration
+        while time.time() < deadline:
+            try:
+                nbytes, _ = sock.recvfrom_into(buf)
+            except socket.timeout:
+                continue
+            now = time.perf_counter()
+            if start is None:
+                start = now
+            yield now - start, bytes(buf[:nbytes])
+
+    try:
+        count = write_recording(path, packets())
+    finally:
+        sock.close()
+    print(f"[⏺] {count}개 데이터그램 녹화 → {path}")
+
+
+def synthesize(path, image_dir, fps=15.0, source_id=1, loops=1, quality=80):
+    # 카메라 없이 샘플 이미지로 청크 스트림 생성 (클라이언트와 같은 방식으로 분할)
+    paths = sorted(glob.glob(os.path.join(image_dir, "*.jpg")) + glob.glob(os.path.join(image_dir, "*.png")))
+    jpegs = []
+    for p in paths:
+        img = cv2.imread(p)
+        if img is not None:
+            jpegs.append(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes())
+    if not jpegs:
+        raise FileNotFoundError(f"이미지를 찾을 수 없습니다: {image_dir}")
+
+    def packets():
+        seq = 0
+        for _ in range(loops):
+            for data in jpegs:
+                offset = seq / fps
+                for packet in fragment_frame(data, source_id, seq, capture_ts=offset):
+                    yield offset, bytes(packet)
+                seq += 1
+
+    count = write_recording(path, packets())
+    print(f"[⏺] 이미지 {len(jpegs)}장 x {loops}회 → 데이터그램 {count}개 ({path})")
+
+
+def replay(packets, target, speed=1.0, stamp=True):
+    """
+    녹화한 데이터그램을 target 으로 재전송
+    :param speed: 1 = 원래 속도, 2 = 두 배 빠르게, 0 = 최대 속도
+    :param stamp: 청크 헤더의 capture_ts 를 전송 시각으로 바꿈 (수신 측 지연 / 지터 계산용)
+    :return: 전송에 걸린 시간 (초)
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 << 20)
+    start = time.perf_counter()
+    try:
+        for offset, packet in packets:
+            if speed > 0:
+                delay = start + offset / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if stamp and is_chunk_packet(packet):
+                packet = bytearray(packet)
+                struct.pack_into("!d", packet, HEADER.size - 8, time.time())
+            sock.sendto(packet, target)
+    finally:
+        sock.close()
+    return time.perf_counter() - start
+
+
+def parse_target(value):
+    host, port = value.rsplit(":", 1)
+    return host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP 프레임 스트림 녹화 / 재생")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="UDP 포트로 들어오는 데이터그램 녹화")
+    p.add_argument("--out", required=True)
+    p.add_argument("--port", type=int, default=1234)
+    p.add_argument("--duration", type=float, default=60)
+
+    p = sub.add_parser("synth", help="샘플 이미지로 녹화 파일 생성")
+    p.add_argument("--images", required=True)
+    p.add_argument("--out", required=True)
+    p.add_argument("--fps", type=float, default=15)
+    p.add_argument("--source-id", type=int, default=1)
+    p.add_argument("--loops", type=int, default=1)
+
+    p = sub.add_parser("replay", help="녹화 파일 재생")
+    p.add_argument("file")
+    p.add_argument("--target", type=parse_target, default=("127.0.0.1", 1234))
+    p.add_argument("--speed", type=float, default=1.0, help="1 = 원래 속도, 0 = 최대 속도")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.out, args.port, args.duration)
+    elif args.command == "synth":
+        synthesize(args.out, args.images, args.fps, args.source_id, args.loops)
+    else:
+        packets = read_recording(args.file)
+        elapsed = replay(packets, args.target, args.speed)
+        print(f"[▶] 프레임 {count_frames(packets)}장 (데이터그램 {len(packets)}개) 전송, {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import numpy as np
+
+from opencv_tracker_factory import create_tracker
+
+# ===============================
+# 트래커 백엔드 레지스트리
+# 모든 백엔드는 "트랙 집합" 단위로 동작
+#   add(track_id, frame, box)      : 새 트랙 등록 (box = [x1, y1, x2, y2])
+#   predict(frame)                 : 모든 트랙을 한 프레임 전진 → (track_ids, boxes[N, 4])
+#                                    (놓친 트랙은 결과에서 빠지고 백엔드에서도 제거됨)
+#   correct(track_ids, boxes)      : 매칭된 감지 박스로 트랙 보정
+#   remove(track_id)               : 트랙 삭제
+# ===============================
+TRACKER_BACKENDS = {}
+
+
+def register_backend(*names):
+    def wrapper(factory):
+        for name in names:
+            TRACKER_BACKENDS[name.upper()] = factory
+        return factory
+    return wrapper
+
+
+def create_tracker_backend(name="KCF"):
+    """
+    이름으로 트래커 백엔드 생성 (KCF, CSRT, MOSSE, KALMAN)
+    """
+    factory = TRACKER_BACKENDS.get(name.upper())
+    if factory is None:
+        raise ValueError(f"Unknown tracker backend: {name} (available: {', '.join(sorted(TRACKER_BACKENDS))})")
+    return factory(name.upper())
+
+
+# ===============================
+# OpenCV 트래커 (트랙마다 이미지 상관 업데이트)
+# ===============================
+@register_backend("KCF", "CSRT", "MOSSE")
+class OpenCVTrackerSet:
+    def __init__(self, name="KCF"):
+        self.name = name
+        self.trackers = {}
+
+    def __len__(self):
+        return len(self.trackers)
+
+    def add(self, track_id, frame, box):
+        x1, y1, x2, y2 = map(int, box)
+        tracker = create_tracker(self.name)
+        tracker.init(frame, (x1, y1, x2 - x1, y2 - y1))
+        self.trackers[track_id] = tracker
+
+    def predict(self, frame):
+        track_ids, boxes, lost = [], [], []
+        for track_id, tracker in self.trackers.items():
+            success, (x, y, w, h) = tracker.update(frame)
+            if success:
+                track_ids.append(track_id)
+                boxes.append([x, y, x + w, y + h])
+            else:
+                lost.append(track_id)
+        # 한 번 놓친 상관 필터는 다시 잡지 못하므로 바로 제거 (재감지로 새 트랙 생성)
+        for track_id in lost:
+            del self.trackers[track_id]
+        return track_ids, np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+    def correct(self, track_ids, boxes):
+        # OpenCV 트래커는 자체 상관 필터로 위치를 갱신하므로 보정 없음
+        pass
+
+    def remove(self, track_id):
+        self.trackers.pop(track_id, None)
+
+
+# ===============================
+# 등속 칼만 박스 트래커 (좌표만 사용, 모든 트랙을 NumPy 배열로 일괄 처리)
+# 상태: [cx, cy, w, h, vx, vy, vw, vh]
+# ===============================
+@register_backend("KALMAN")
+class KalmanBoxTracker:
+    def __init__(self, name="KALMAN", process_noise=1.0, measurement_noise=10.0):
+        self.name = name
+        self.track_ids = []
+        self.x = np.zeros((0, 8), dtype=np.float64)
+        self.P = np.zeros((0, 8, 8), dtype=np.float64)
+
+        self.F = np.eye(8)
+        self.F[:4, 4:] = np.eye(4)
+        self.H = np.eye(4, 8)
+        self.Q = np.eye(8) * process_noise
+        self.Q[4:, 4:] *= 0.01
+        self.R = np.eye(4) * measurement_noise
+        # 처음에는 속도를 모르므로 속도 분산을 크게
+        self.P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0, 1000.0])
+
+    def __len__(self):
+        return len(self.track_ids)
+
+    @staticmethod
+    def _to_measurement(boxes):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        w = boxes[:, 2] - boxes[:, 0]
+        h = boxes[:, 3] - boxes[:, 1]
+        return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w, h], axis=1)
+
+    def _to_boxes(self):
+        cx, cy = self.x[:, 0], self.x[:, 1]
+        w = np.maximum(self.x[:, 2], 1.0)
+        h = np.maximum(self.x[:, 3], 1.0)
+        return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1).astype(np.float32)
+
+    def add(self, track_id, frame, box):
+        z = self._to_measurement(box)
+        state = np.zeros((1, 8))
+        state[:, :4] = z
+        self.track_ids.append(track_id)
+        self.x = np.concatenate([self.x, state])
+        self.P = np.concatenate([self.P, self.P0[None]])
+
+    def predict(self, frame=None):
+        if not self.track_ids:
+            return [], np.zeros((0, 4), dtype=np.float32)
+        self.x = self.x @ self.F.T
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return list(self.track_ids), self._to_boxes()
+
+    def correct(self, track_ids, boxes):
+        if len(track_ids) == 0:
+            return
+        index = {track_id: i for i, track_id in enumerate(self.track_ids)}
+        idx = np.array([index[t] for t in track_ids], dtype=np.intp)
+        z = self._to_measurement(boxes)
+
+        P = self.P[idx]
+        y = z - self.x[idx] @ self.H.T
+        S = self.H @ P @ self.H.T + self.R
+        # K = P Hᵀ S⁻¹ (S 는 대칭이므로 solve 로 계산)
+        K = np.linalg.solve(S, self.H @ P).transpose(0, 2, 1)
+        self.x[idx] += np.einsum("nij,nj->ni", K, y)
+        self.P[idx] = (np.eye(8) - K @ self.H) @ P
+
+    def remove(self, track_id):
+        if track_id not in self.track_ids:
+            return
+        i = self.track_ids.index(track_id)
+        del self.track_ids[i]
+        self.x = np.delete(self.x, i, axis=0)
+        self.P = np.delete(self.P, i, axis=0)
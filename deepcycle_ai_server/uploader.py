@@ -0,0 +1,283 @@
+import atexit
+import base64
+import json
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 스풀 레코드: [메타데이터 길이, 이미지 길이] + 메타데이터 JSON + 이미지 바이트
+SPOOL_RECORD = struct.Struct("!II")
+# 스풀 메타데이터에만 넣는 실패 횟수 키 (전송할 때는 빼고 보냄)
+SPOOL_ATTEMPTS_KEY = "_spool_attempts"
+
+# _send_once 결과
+SENT = "sent"                   # 처리 끝 (성공, 또는 4xx 라 다시 보내도 소용없음)
+FAILED = "failed"               # 서버가 5xx 로 응답 - 서버는 살아 있고 이 레코드만 실패
+UNREACHABLE = "unreachable"     # 연결 실패 / 타임아웃 - DB 서버 다운
+
+
+# ===============================
+# DB 서버 업로더
+# - requests.Session 연결 풀 재사용 (업로드마다 새 TCP 연결 안 함)
+# - 워커 max_in_flight 개가 동시에 전송, 대기 큐도 같은 크기로 제한
+# - 실패하면 지수 백오프로 재시도, 그래도 실패하면 스풀 파일에 추가
+#   연결 실패 / 타임아웃일 때만 DB 서버 다운으로 보고, 다운 동안 들어온 결과는 바로 스풀에 쌓음
+# - 주기적으로 스풀을 통째로 재전송해서 복구 확인
+# - 결과마다 upload_id (멱등 키) 를 붙여서 재시도 / 재전송이 DB 에 두 번 기록되지 않도록 하고,
+#   스풀 재전송은 replayed=1 로 보내서 DB 서버가 ESP32 알림을 건너뜀 (물체는 이미 지나감)
+#   5xx 는 그 레코드만의 문제일 수 있으므로 뒤 레코드는 계속 보내고, 실패 레코드는 스풀 끝으로
+#   max_attempts 번 실패한 레코드는 dead letter 파일로 옮김 (한 건 때문에 전체 업로드가 막히지 않도록)
+# submit() 은 절대 블로킹하지 않음 (창이 가득 차면 스풀로)
+# ===============================
+class Uploader:
+    def __init__(self, url, binary=True, max_in_flight=4, max_retries=3, backoff=0.5, max_backoff=8.0,
+                 timeout=(3.0, 10.0), spool_path="upload_spool.bin", replay_interval=10.0, max_attempts=5,
+                 metrics=None):
+        """
+        :param url: 업로드 주소 (binary=True 면 /uploadBinary, False 면 Base64 JSON /upload)
+        :param timeout: (연결, 응답) 타임아웃 초
+        :param max_attempts: 5xx 로 이 횟수만큼 실패한 스풀 레코드는 spool_path + ".dead" 로 옮김
+        :param metrics: Metrics (있으면 요청마다 upload 지연 기록)
+        """
+        self.url = url
+        self.binary = binary
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.spool_path = spool_path
+        self.replay_path = spool_path + ".replay"
+        self.dead_letter_path = spool_path + ".dead"
+        self.replay_interval = replay_interval
+        self.max_attempts = max_attempts
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.pending = queue.Queue(maxsize=max_in_flight)
+        self.spool_lock = threading.Lock()
+        self.server_down = threading.Event()
+        self.stop_event = threading.Event()
+
+        self.sent = 0
+        self.retried = 0
+        self.rejected = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"Uploader-{i}", daemon=True)
+            for i in range(max_in_flight)
+        ]
+        self.threads.append(threading.Thread(target=self._replay_loop, name="UploadReplay", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        atexit.register(self.close)
+
+    def submit(self, metadata, image):
+        """
+        :param metadata: deepcycle_center_id / class / confidence / box / extension (+ crop_offset / image_scale)
+        :param image: 이미지 바이트 (JPEG)
+        """
+        if "upload_id" not in metadata:
+            metadata = dict(metadata, upload_id=uuid.uuid4().hex)
+        if self.server_down.is_set():
+            self.spool(metadata, image)
+            return
+        try:
+            self.pending.put_nowait((metadata, image))
+        except queue.Full:
+            self.spool(metadata, image)
+
+    def _post(self, metadata, image):
+        if self.binary:
+            # 리스트 값 (box, crop_offset) 은 쿼리 파라미터로 "x1,y1,..." 형식
+            params = {k: ",".join(map(str, v)) if isinstance(v, (list, tuple)) else v for k, v in metadata.items()}
+            return self.session.post(self.url, params=params, data=image,
+                                     headers={"Content-Type": "image/jpeg"}, timeout=self.timeout)
+        payload = dict(metadata, image=base64.b64encode(image).decode("utf-8"))
+        return self.session.post(self.url, json=payload, timeout=self.timeout)
+
+    def _send_once(self, metadata, image):
+        """
+        :return: SENT / FAILED / UNREACHABLE
+        """
+        start = time.perf_counter()
+        try:
+            response = self._post(metadata, image)
+            if self.metrics is not None:
+                self.metrics.observe("upload", time.perf_counter() - start)
+            # 응답 본문은 파싱하지 않고 그대로 로그 (JSON 이 아닌 응답으로 워커가 죽지 않도록)
+            if response.status_code == 200:
+                self.sent += 1
+                print(f"Flask 응답: {response.status_code} {response.text[:200]}")
+                return SENT
+            print(f"⚠️ Flask 오류: {response.status_code} - {response.text[:200]}")
+        except requests.RequestException as e:
+            print(f"[❌] Flask 전송 실패: {e}")
+            return UNREACHABLE
+        if response.status_code < 500:
+            self.rejected += 1
+            return SENT
+        return FAILED
+
+    def _send(self, metadata, image):
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            result = self._send_once(metadata, image)
+            if result == SENT or attempt == self.max_retries or self.stop_event.is_set():
+                return result
+            self.retried += 1
+            # 지수 백오프 + 지터 (워커들이 동시에 다시 몰리지 않도록)
+            time.sleep(random.uniform(0.5, 1.0) * delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            try:
+                metadata, image = self.pending.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                result = UNREACHABLE if self.server_down.is_set() else self._send(metadata, image)
+                if result == UNREACHABLE:
+                    self.server_down.set()
+                    self.spool(metadata, image)
+                elif result == FAILED:
+                    # 서버는 응답하므로 다운은 아님, 이 결과만 스풀에서 다시
+                    self.spool(metadata, image, attempts=1)
+            except Exception as e:
+                # 예상 못 한 오류도 이 결과만 스풀로 넘기고 워커는 계속
+                print(f"[⚠️] 업로드 워커 오류: {e}")
+                try:
+                    self.spool(metadata, image)
+                except OSError as spool_error:
+                    print(f"[❌] 스풀 기록 실패, 결과 1건 유실: {spool_error}")
+
+    # ===============================
+    # 스풀 (append-only)
+    # ===============================
+    def spool(self, metadata, image, attempts=0, count=True):
+        with self.spool_lock:
+            self._append(self.spool_path, metadata, image, attempts)
+            if count:
+                self.spooled += 1
+
+    @staticmethod
+    def _append(path, metadata, image, attempts):
+        if attempts:
+            metadata = dict(metadata, **{SPOOL_ATTEMPTS_KEY: attempts})
+        meta = json.dumps(metadata).encode()
+        with open(path, "ab") as f:
+            f.write(SPOOL_RECORD.pack(len(meta), len(image)))
+            f.write(meta)
+            f.write(image)
+
+    def _requeue_failed(self, metadata, image, attempts):
+        # 5xx 로 실패한 레코드는 스풀 끝으로, max_attempts 번째면 dead letter 파일로
+        with self.spool_lock:
+            if attempts < self.max_attempts:
+                self._append(self.spool_path, metadata, image, attempts)
+                return
+            self._append(self.dead_letter_path, metadata, image, attempts)
+            self.dead_lettered += 1
+        print(f"[⚠️] 업로드 {attempts}회 실패 → dead letter 로 이동 ({self.dead_letter_path})")
+
+    @staticmethod
+    def _read_spool(path):
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(SPOOL_RECORD.size)
+                if len(header) < SPOOL_RECORD.size:
+                    return
+                meta_len, image_len = SPOOL_RECORD.unpack(header)
+                meta = f.read(meta_len)
+                image = f.read(image_len)
+                if len(meta) < meta_len or len(image) < image_len:
+                    # 기록 도중 종료된 마지막 레코드는 버림
+                    return
+                try:
+                    metadata = json.loads(meta)
+                except ValueError:
+                    # 깨진 레코드 하나 때문에 재전송이 매번 멈추지 않도록 건너뜀
+                    print("[⚠️] 스풀 레코드 메타데이터 손상 - 건너뜀")
+                    continue
+                attempts = metadata.pop(SPOOL_ATTEMPTS_KEY, 0)
+                yield metadata, image, attempts
+
+    def _replay_loop(self):
+        while not self.stop_event.wait(self.replay_interval):
+            try:
+                self.replay()
+            except Exception as e:
+                # 남은 재전송 파일은 다음 주기에 이어서
+                print(f"[⚠️] 스풀 재전송 오류: {e}")
+
+    def replay(self):
+        """
+        스풀을 한 번에 재전송 (순서대로, 같은 keep-alive 연결)
+        - 연결 실패면 남은 레코드를 다시 스풀에 넣고 다음 주기에 재시도
+        - 5xx 면 그 레코드만 스풀 끝으로 보내고 나머지는 계속, 이번 주기는 파일 한 번만 훑음
+        → 재전송 중 종료되면 일부가 두 번 업로드될 수 있음 (at-least-once)
+        """
+        while not self.stop_event.is_set():
+            with self.spool_lock:
+                # 이전 재전송 파일이 남아 있으면 (중간에 종료) 그것부터
+                if not os.path.exists(self.replay_path):
+                    if not os.path.exists(self.spool_path) or os.path.getsize(self.spool_path) == 0:
+                        self.server_down.clear()
+                        return
+                    os.replace(self.spool_path, self.replay_path)
+
+            records = self._read_spool(self.replay_path)
+            count = failed = 0
+            for metadata, image, attempts in records:
+                result = UNREACHABLE if self.stop_event.is_set() \
+                    else self._send_once(dict(metadata, replayed=1), image)
+                if result == UNREACHABLE:
+                    self.server_down.set()
+                    self.spool(metadata, image, attempts, count=False)
+                    for rest in records:
+                        self.spool(*rest, count=False)
+                    records.close()
+                    os.remove(self.replay_path)
+                    print(f"[📦] 스풀 재전송 중단 ({count}건 전송), DB 서버 응답 없음")
+                    return
+                if result == FAILED:
+                    failed += 1
+                    self._requeue_failed(metadata, image, attempts + 1)
+                    continue
+                count += 1
+                self.replayed += 1
+            os.remove(self.replay_path)
+            print(f"[📦] 스풀 재전송 완료: {count}건{f', 실패 {failed}건은 다음 주기에' if failed else ''}")
+            if failed:
+                # 서버는 응답하고 있으므로 새 결과는 바로 전송
+                self.server_down.clear()
+                return
+
+    def stats(self):
+        return (f"업로드 성공 {self.sent}, 거부 {self.rejected}, 재시도 {self.retried}, "
+                f"스풀 {self.spooled}, 재전송 {self.replayed}, dead letter {self.dead_lettered}, 대기 {self.pending.qsize()}"
+                f"{' (DB 서버 다운)' if self.server_down.is_set() else ''}")
+
+    def close(self):
+        # 아직 보내지 못한 결과는 스풀에 남겨서 다음 실행 때 재전송
+        self.stop_event.set()
+        while True:
+            try:
+                self.spool(*self.pending.get_nowait())
+            except queue.Empty:
+                break
+        self.session.close()
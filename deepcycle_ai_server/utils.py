@@ -1,6 +1,7 @@
 import cv2
 import base64
 import queue
+import numpy as np
 
 # ===============================
 # IOU 계산 함수 (객체 동일성 판단용)
@@ -16,6 +17,47 @@ def iou(box1, box2):
     union_area = box1_area + box2_area - inter_area
     return inter_area / union_area if union_area else 0
 
+# ===============================
+# IOU 행렬 계산 (N개 박스 × M개 박스를 한 번에)
+# ===============================
+def iou_matrix(boxes1, boxes2):
+    a = np.asarray(boxes1, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes2, dtype=np.float32).reshape(-1, 4)
+    xi1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    yi1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    xi2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    yi2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter_area = np.clip(xi2 - xi1, 0, None) * np.clip(yi2 - yi1, 0, None)
+    area1 = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area2 = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union_area = area1[:, None] + area2[None, :] - inter_area
+    return np.divide(inter_area, union_area, out=np.zeros_like(inter_area), where=union_area > 0)
+
+# ===============================
+# 수신 버퍼(JPEG 바이트) → 이미지 디코딩 함수
+# ===============================
+def decode_image(buf, nbytes=None, keep_jpeg=False):
+    """
+    :param keep_jpeg: True 면 수신한 JPEG 바이트를 복사해 frame.jpeg 로 보관 (업로드 시 재인코딩 생략)
+    """
+    data = np.frombuffer(buf, np.uint8, count=-1 if nbytes is None else nbytes)
+    frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if frame is None or not keep_jpeg or data[:2].tobytes() != b"\xff\xd8":
+        return frame
+    frame = frame.view(JpegFrame)
+    frame.jpeg = data.tobytes()
+    return frame
+
+
+# ===============================
+# 원본 JPEG 바이트를 함께 들고 다니는 프레임
+# 파이프라인에서는 일반 ndarray 와 똑같이 쓰이고, 슬라이스 / 복사본에는 jpeg 가 이어지지 않음
+# (픽셀이 원본 JPEG 와 같은 프레임만 jpeg 를 가짐)
+# ===============================
+class JpegFrame(np.ndarray):
+    def __array_finalize__(self, obj):
+        self.jpeg = None
+
 # ===============================
 # 이미지 → base64 인코딩 함수
 # ===============================
@@ -24,3 +66,36 @@ def encode_image_to_base64(frame):
     if not ret:
         return None
     return base64.b64encode(buffer).decode("utf-8")
+
+
+# ===============================
+# ROI (관심 영역) 크롭
+# ===============================
+def crop_roi(frame, roi):
+    """
+    :param roi: (x1, y1, x2, y2) 프레임 좌표 또는 None (전체 프레임)
+    :return: (crop, (dx, dy)) - crop 은 복사 없는 뷰, (dx, dy) 는 박스를 되돌릴 오프셋
+    """
+    if roi is None:
+        return frame, (0, 0)
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = roi
+    x1, y1 = min(max(int(x1), 0), w - 1), min(max(int(y1), 0), h - 1)
+    x2, y2 = max(min(int(x2), w), x1 + 1), max(min(int(y2), h), y1 + 1)
+    return frame[y1:y2, x1:x2], (x1, y1)
+
+
+# ===============================
+# 박스 주변 여백 포함 영역 (업로드용 물체 크롭)
+# ===============================
+def pad_box(box, padding, shape):
+    """
+    :param padding: 박스 너비 / 높이 대비 양쪽 여백 비율
+    :param shape: frame.shape (결과는 프레임 안으로 자름)
+    :return: (x1, y1, x2, y2) int
+    """
+    h, w = shape[:2]
+    x1, y1, x2, y2 = box
+    pad_x, pad_y = (x2 - x1) * padding, (y2 - y1) * padding
+    return (max(int(x1 - pad_x), 0), max(int(y1 - pad_y), 0),
+            min(int(round(x2 + pad_x)), w), min(int(round(y2 + pad_y)), h))
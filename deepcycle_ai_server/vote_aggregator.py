@@ -0,0 +1,63 @@
+import numpy as np
+
+
+# ===============================
+# 스트리밍 투표 집계 (윈도우당 메모리 일정)
+# - 클래스별 개수 / conf 합계를 누적
+# - 클래스별로 conf 가 가장 높은 후보 하나(박스 + 프레임)만 보관
+# ===============================
+class VoteAggregator:
+    def __init__(self, num_classes=12, min_conf=0.5):  # num_classes: yolo_detector.CLASS_NAMES 개수
+        self.num_classes = num_classes
+        self.min_conf = min_conf
+        self.counts = np.zeros(num_classes, dtype=np.int64)
+        self.conf_sums = np.zeros(num_classes, dtype=np.float64)
+        self.best_confs = np.full(num_classes, -1.0, dtype=np.float32)
+        self.best = [None] * num_classes   # class_id → (box, frame, 프레임 수신 시각)
+        # 클래스가 윈도우에서 처음 나온 시각 (결정 지연 측정용)
+        self.first_seen = np.zeros(num_classes, dtype=np.float64)
+
+    @property
+    def empty(self):
+        return not self.counts.any()
+
+    def add(self, dets, now=0.0, recv_time=None):
+        """
+        새로 잡힌 객체들(Detections)을 반영 - 감지당 O(1)
+        :param recv_time: dets.frame 의 수신 시각 (수신 → 결과 지연 측정용)
+        """
+        keep = (dets.confs >= self.min_conf) & (dets.class_ids < self.num_classes)
+        if not keep.any():
+            return
+        class_ids = dets.class_ids[keep]
+        confs = dets.confs[keep]
+        boxes = dets.boxes[keep]
+
+        self.first_seen[class_ids[self.counts[class_ids] == 0]] = now
+        np.add.at(self.counts, class_ids, 1)
+        np.add.at(self.conf_sums, class_ids, confs)
+
+        # 클래스별 최고 conf 후보 갱신
+        for i in np.flatnonzero(confs > self.best_confs[class_ids]):
+            class_id = class_ids[i]
+            if confs[i] > self.best_confs[class_id]:
+                self.best_confs[class_id] = confs[i]
+                self.best[class_id] = (boxes[i].tolist(), dets.frame, recv_time)
+
+    def winner(self):
+        """
+        가장 많이 나온 클래스 (빈도가 같으면 평균 conf 가 높은 클래스)의 최고 conf 후보
+        :return: (class_id, conf, box, frame, first_seen, recv_time) 또는 None
+        """
+        if self.empty:
+            return None
+        mean_confs = np.divide(self.conf_sums, self.counts, out=np.zeros_like(self.conf_sums), where=self.counts > 0)
+        class_id = int(np.lexsort((mean_confs, self.counts))[-1])
+        box, frame, recv_time = self.best[class_id]
+        return class_id, float(self.best_confs[class_id]), box, frame, float(self.first_seen[class_id]), recv_time
+
+    def reset(self):
+        self.counts[:] = 0
+        self.conf_sums[:] = 0
+        self.best_confs[:] = -1.0
+        self.best = [None] * self.num_classes
@@ -1,23 +1,100 @@
-from ultralytics import YOLO
 import numpy as np
 import cv2
-import torch 
 import queue
 
+from model_export import export_model
+from utils import crop_roi
+
 CLASS_NAMES = {
     0: "Paper", 1: "Paper Pack", 2: "Paper Cup", 3: "Can", 4: "Glass Bottle",
     5: "PET Bottle", 6: "Plastic", 7: "Vinyl", 8: "Glass & Multi-layer Packaging",
     9: "PET & Multi-layer Packaging", 10: "Styrofoam", 11: "Battery"
 }
 
-class YoloDetector:
-    def __init__(self, model_path):
-        self.model = YOLO(model_path)
-        self.model.to("cuda" if torch.cuda.is_available() else "cpu")
 
+# ===============================
+# 감지 결과 (struct-of-arrays)
+#   boxes     : (N, 4) int32 [x1, y1, x2, y2]
+#   class_ids : (N,) int32
+#   confs     : (N,) float32
+#   frame     : 감지한 프레임 (참조만, 복사 안 함)
+# ===============================
+class Detections:
+    __slots__ = ("boxes", "class_ids", "confs", "frame")
+
+    def __init__(self, boxes, class_ids, confs, frame=None):
+        self.boxes = boxes
+        self.class_ids = class_ids
+        self.confs = confs
+        self.frame = frame
+
+    @classmethod
+    def empty(cls, frame=None):
+        return cls(np.zeros((0, 4), np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32), frame)
+
+    @classmethod
+    def from_array(cls, data, frame=None):
+        # data: (N, 6) [x1, y1, x2, y2, conf, cls] - Ultralytics boxes.data 와 같은 배치
+        data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+        return cls(data[:, :4].astype(np.int32), data[:, 5].astype(np.int32), data[:, 4].copy(), frame)
 
-    def detect(self, frame):
-        results = self.model.predict(frame, imgsz=640, conf=0.25, verbose=False)[0]
+    def __len__(self):
+        return len(self.confs)
+
+    def __getitem__(self, index):
+        # 인덱스 배열 / bool 마스크로 부분 선택 (frame 참조는 유지)
+        return Detections(self.boxes[index], self.class_ids[index], self.confs[index], self.frame)
+
+    def filter(self, min_conf):
+        return self[self.confs >= min_conf]
+
+    def shift(self, dx, dy):
+        # ROI 크롭 좌표 → 전체 프레임 좌표 (제자리 변환)
+        if dx or dy:
+            self.boxes += np.array([dx, dy, dx, dy], dtype=np.int32)
+        return self
+
+    def __repr__(self):
+        return f"Detections(n={len(self)})"
+
+
+# ===============================
+# ROI 크롭에 맞는 모델 입력 크기 선택
+# ===============================
+MAX_INPUT_SIZE = 640
+MIN_INPUT_SIZE = 160
+INPUT_STRIDE = 32
+
+
+def input_size_for(width, height):
+    # 크롭을 확대하지 않고 담을 수 있는 가장 작은 stride 배수 (MIN ~ MAX_INPUT_SIZE)
+    side = -(-max(width, height) // INPUT_STRIDE) * INPUT_STRIDE
+    return min(max(side, MIN_INPUT_SIZE), MAX_INPUT_SIZE)
+
+
+class YoloDetector:
+    def __init__(self, model_path, backend="torch", int8=False, calibration_data=None):
+        """
+        :param backend: "torch" (.pt 그대로), "onnx" (ONNX Runtime), "openvino" (OpenVINO) - CPU 배포용
+        :param int8: INT8 양자화 모델 사용 (calibration_data 필요, model_export.py 참고)
+        """
+        # ultralytics / torch 는 import 만으로 수 초 걸리므로 모델을 만들 때 import
+        # (server.py 는 수신 스레드를 먼저 띄우고 백그라운드에서 모델 로드)
+        import torch
+        from ultralytics import YOLO
+
+        self.backend = backend
+        if backend == "torch":
+            self.model = YOLO(model_path)
+            self.model.to("cuda" if torch.cuda.is_available() else "cpu")
+        else:
+            # 변환된 모델도 Ultralytics 가 같은 predict 인터페이스로 실행
+            self.model = YOLO(export_model(model_path, backend, int8, calibration_data), task="detect")
+
+
+    def detect(self, frame, roi=None):
+        crop, (dx, dy) = crop_roi(frame, roi)
+        results = self.model.predict(crop, imgsz=input_size_for(crop.shape[1], crop.shape[0]), conf=0.25, verbose=False)[0]
         best_conf = 0
         best_class_id = None
         best_box = None
@@ -31,27 +108,30 @@ class YoloDetector:
             if conf > best_conf:
                 best_conf = conf
                 best_class_id = cls
-                best_box = [x1, y1, x2, y2]
+                best_box = [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
 
         return best_box, best_class_id, best_conf
     # 모든 감지 결과
-    def detect_all(self, frame):
-        results = self.model.predict(frame, imgsz=640, conf=0.25, verbose=False)[0]
-        boxes = []
-        class_ids = []
-        confs = []
-
-        for box in results.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            conf = box.conf.item()
-            cls = int(box.cls[0])
-
-            if conf >= 0.25:  # threshold는 필요에 따라 조정 가능
-                boxes.append([x1, y1, x2, y2])
-                class_ids.append(cls)
-                confs.append(conf)
-
-        return boxes, class_ids, confs
+    # roi 가 있으면 그 영역만 (필요한 만큼 작은 입력 크기로) 추론하고 박스는 전체 프레임 좌표로 반환
+    def detect_all(self, frame, roi=None):
+        crop, offset = crop_roi(frame, roi)
+        results = self.model.predict(crop, imgsz=input_size_for(crop.shape[1], crop.shape[0]), conf=0.25, verbose=False)[0]
+        return self._parse_result(results, frame).shift(*offset)
+
+    # 마이크로 배치: 여러 프레임을 한 번의 predict 호출로 처리
+    # → 프레임별 Detections 를 입력 순서대로 반환 (입력 크기는 배치에서 가장 큰 크롭 기준)
+    def detect_batch(self, frames, rois=None):
+        if not frames:
+            return []
+        crops, offsets = zip(*(crop_roi(frame, roi) for frame, roi in zip(frames, rois or [None] * len(frames))))
+        imgsz = max(input_size_for(crop.shape[1], crop.shape[0]) for crop in crops)
+        results = self.model.predict(list(crops), imgsz=imgsz, conf=0.25, verbose=False)
+        return [self._parse_result(r, frame).shift(*offset) for r, frame, offset in zip(results, frames, offsets)]
+
+    def _parse_result(self, results, frame=None):
+        # 박스 전체를 한 번에 NumPy 로 가져옴 (박스마다 .item() 호출 없음)
+        detections = Detections.from_array(results.boxes.data.cpu().numpy(), frame)
+        return detections.filter(0.25)  # threshold는 필요에 따라 조정 가능
 
 
     
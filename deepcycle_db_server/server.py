@@ -1,13 +1,17 @@
 from flask import Flask, request, send_from_directory
-from flask_restx import Api, Resource, fields, Namespace
+from flask_restx import Api, Resource, fields, Namespace, reqparse
 from db import insert_image_result, get_image_list_with_pagination, get_statistics, select_esp32_ip, update_trash_status
 from utils import handle_exception, get_ip_from_ifconfig, is_allowed_extension, notify_esp32
 
 from dotenv import load_dotenv
 import os
 import base64
+import collections
+import json
 import datetime
 import threading
+import time
+import uuid
 
 
 app = Flask(__name__)
@@ -25,6 +29,14 @@ load_dotenv()
 DATA_SERVER_URL = "http://" + get_ip_from_ifconfig() + ":5000"
 UPLOAD_FOLDER = os.path.abspath("./data")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# /uploadBinary 본문을 디스크로 옮길 때 한 번에 읽는 크기
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# 업로드 멱등 키 (upload_id) 를 기억하는 최근 요청 수
+# AI 서버의 재시도 / 스풀 재전송이 같은 결과를 다시 보내면 DB 기록 / ESP32 알림 없이 처음 응답을 그대로 돌려줌
+# (메모리에만 보관 - DB 서버를 재시작하면 초기화)
+UPLOAD_DEDUP_SIZE = 10000
+recent_uploads = collections.OrderedDict()     # upload_id → image_name (처리 중이면 None)
+recent_uploads_lock = threading.Lock()
 
 upload_model = ns.model('UploadModel', {
     'image': fields.String(required=True, description='Base64 인코딩된 이미지'),
@@ -32,7 +44,11 @@ upload_model = ns.model('UploadModel', {
     'box': fields.List(fields.Integer, required=True, description='탐지된 박스 좌표 [x1, y1, x2, y2]'),
     'deepcycle_center_id': fields.Integer(required=True, description='deepcycle center id'),
     'confidence': fields.Float(required=True, description='탐지 신뢰도'),
-    'class': fields.Integer(required=True, description='재질 클래스 1: paper 2: can 3: glass 4: plastic 5: vinyl 6: general 7: battery')
+    'class': fields.Integer(required=True, description='재질 클래스 1: paper 2: can 3: glass 4: plastic 5: vinyl 6: general 7: battery'),
+    'crop_offset': fields.List(fields.Integer, required=False, description='이미지가 원본 프레임 크롭이면 크롭 시작 좌표 [x, y]'),
+    'image_scale': fields.Float(required=False, description='이미지 축소 비율 (기본 1.0)'),
+    'upload_id': fields.String(required=False, description='멱등 키 - 같은 값으로 다시 오면 저장 / 알림 없이 처음 결과를 응답'),
+    'replayed': fields.Integer(required=False, description='1 이면 스풀 재전송 (DB 에만 기록, ESP32 알림 안 함)')
 })
 
 upload_response_model = ns.model('UploadResponse', {
@@ -49,6 +65,9 @@ class Upload(Resource):
         이미지 업로드 및 저장 API
         - 이미지 Base64 데이터와 메타 정보를 받아 DB에 저장하고 ESP32에 알림
         """
+        cpu_start = time.thread_time()
+        filepath = None
+        upload_id = None
         try:
             data = request.get_json(force=True)
             required_fields = ['image', 'extension', 'box', 'deepcycle_center_id', 'confidence', 'class']
@@ -65,21 +84,208 @@ class Upload(Resource):
             deepcycle_center_id = data["deepcycle_center_id"]
             result_confidence = data["confidence"]
             material_code = data["class"]
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            image_name = f"{deepcycle_center_id}_{material_code}_{timestamp}.{ext}"
-            filepath = os.path.join(UPLOAD_FOLDER, image_name)
-            
-            threading.Thread(target=notify_esp32, args=(deepcycle_center_id, material_code, image_name, center_ip_map)).start()
+            image_name = new_image_name(deepcycle_center_id, material_code, ext)
             
+            crop_offset = data.get('crop_offset') or [0, 0]
+            if len(crop_offset) != 2:
+                return handle_exception("upload_image", "crop_offset 은 [x, y] 형식이어야 합니다.", status_code=400)(Exception(f"Invalid crop_offset: {crop_offset}"))
+            image_scale = data.get('image_scale')
+            try:
+                image_scale = 1.0 if image_scale is None else float(image_scale)
+            except (TypeError, ValueError):
+                image_scale = 0.0
+            if image_scale <= 0:
+                return handle_exception("upload_image", "image_scale 은 0 보다 큰 숫자여야 합니다.", status_code=400)(Exception(f"Invalid image_scale: {data.get('image_scale')}"))
+
+            upload_id = data.get('upload_id')
+            duplicate = claim_upload("upload_image", upload_id, request.content_length, cpu_start)
+            if duplicate is not None:
+                return duplicate
+
+            # 파일 / 좌표 변환까지 모두 저장한 뒤에 DB 기록, ESP32 알림
+            # (저장 실패로 500 을 돌려주면 AI 서버가 재전송하므로 그 전에 DB / 쓰레기통에 반영되면 안 됨)
+            filepath = os.path.join(UPLOAD_FOLDER, image_name)
             with open(filepath, "wb") as f:
                 f.write(image_data)
             file_size = os.path.getsize(filepath)
+            save_image_transform(image_name, data['box'], crop_offset, image_scale)
             insert_image_result(image_name, deepcycle_center_id, file_size, material_code, result_confidence, detect_box_str)
+            finish_upload(upload_id, image_name)
+            notify_esp32_unless_replayed(data.get('replayed'), deepcycle_center_id, material_code, image_name)
             image_url = f"{DATA_SERVER_URL}/images/{image_name}"
-            return {'status': 'success', 'image_url': image_url}
-        except Exception as e:            
+            return upload_response(image_url, request.content_length, cpu_start)
+        except Exception as e:
+            remove_upload(filepath)
+            finish_upload(upload_id, None)
             return handle_exception("upload_image", "이미지 업로드 중 오류가 발생했습니다.", status_code=500)(e)
 
+
+def new_image_name(deepcycle_center_id, material_code, ext):
+    """
+    업로드 이미지 파일 이름 {center}_{class}_{YYYYmmdd_HHMMSS_ms}_{uuid 8자리}.{ext}
+    (동시 업로드 / 스풀 재전송이 같은 초에 몰려도 서로 덮어쓰지 않도록)
+    """
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    return f"{deepcycle_center_id}_{material_code}_{timestamp}_{uuid.uuid4().hex[:8]}.{ext}"
+
+
+def claim_upload(location, upload_id, request_size, cpu_start):
+    """
+    upload_id 로 중복 요청 확인 (없으면 확인 안 함)
+    :return: None - 새 요청이므로 처리 계속 (처리 중으로 표시), 아니면 바로 돌려줄 응답
+      - 이미 처리된 요청이면 처음 저장한 이미지로 성공 응답 (DB 기록 / ESP32 알림 없음)
+      - 같은 요청을 아직 처리 중이면 503 (업로더가 잠시 뒤 재시도)
+    """
+    if not upload_id:
+        return None
+    with recent_uploads_lock:
+        if upload_id not in recent_uploads:
+            recent_uploads[upload_id] = None
+            while len(recent_uploads) > UPLOAD_DEDUP_SIZE:
+                recent_uploads.popitem(last=False)
+            return None
+        image_name = recent_uploads[upload_id]
+    if image_name is None:
+        return handle_exception(location, "같은 업로드를 처리 중입니다.", status_code=503)(Exception(f"Upload in progress: {upload_id}"))
+    print(f"[{location}] 중복 업로드 {upload_id} → 기존 이미지 {image_name}")
+    return upload_response(f"{DATA_SERVER_URL}/images/{image_name}", request_size, cpu_start)
+
+
+def finish_upload(upload_id, image_name):
+    # 처리 결과 기록 (image_name 이 None 이면 실패 → 지워서 재시도가 다시 처리되도록)
+    if not upload_id:
+        return
+    with recent_uploads_lock:
+        if image_name is None:
+            recent_uploads.pop(upload_id, None)
+        else:
+            recent_uploads[upload_id] = image_name
+
+
+def notify_esp32_unless_replayed(replayed, deepcycle_center_id, material_code, image_name):
+    # 스풀 재전송은 물체가 이미 지나간 뒤라 쓰레기통을 움직이지 않음 (DB 기록만)
+    if replayed:
+        print(f"[ESP32] - 재전송 결과라 알림 생략: {image_name}")
+        return
+    threading.Thread(target=notify_esp32, args=(deepcycle_center_id, material_code, image_name, center_ip_map)).start()
+
+
+def upload_response(image_url, request_size, cpu_start):
+    """
+    업로드 응답 + 요청 크기 / 이 요청이 쓴 서버 CPU 시간 (X-Upload-Cpu-Ms 헤더, 로그)
+    """
+    cpu_ms = (time.thread_time() - cpu_start) * 1000
+    print(f"[upload] 요청 {request_size} bytes, CPU {cpu_ms:.2f} ms")
+    return {'status': 'success', 'image_url': image_url}, 200, {'X-Upload-Cpu-Ms': f"{cpu_ms:.3f}"}
+
+
+def remove_upload(filepath):
+    # 실패한 업로드의 이미지 / 좌표 변환 파일 정리
+    if not filepath:
+        return
+    for path in (filepath, filepath + ".json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def save_image_transform(image_name, box, crop_offset, image_scale):
+    """
+    업로드 이미지가 원본 프레임의 크롭 / 축소본이면 좌표 변환을 <image_name>.json 으로 함께 저장
+    - detection_box (DB) 는 항상 원본 프레임 좌표, 이미지 위 박스 = (detection_box - crop_offset) * image_scale
+    - /images/<image_name>.json 으로 조회 가능 (전체 프레임 그대로면 파일 없음)
+    """
+    dx, dy = crop_offset
+    if dx == 0 and dy == 0 and image_scale == 1.0:
+        return
+    x1, y1, x2, y2 = box
+    transform = {
+        'detection_box': [x1, y1, x2, y2],
+        'crop_offset': [dx, dy],
+        'image_scale': image_scale,
+        'image_box': [round((x1 - dx) * image_scale), round((y1 - dy) * image_scale),
+                      round((x2 - dx) * image_scale), round((y2 - dy) * image_scale)]
+    }
+    with open(os.path.join(UPLOAD_FOLDER, image_name + ".json"), "w") as f:
+        json.dump(transform, f)
+
+
+upload_binary_parser = reqparse.RequestParser()
+upload_binary_parser.add_argument('deepcycle_center_id', type=int, required=True, location='args', help='deepcycle center id')
+upload_binary_parser.add_argument('class', type=int, required=True, location='args', help='재질 클래스 (/upload 와 동일)')
+upload_binary_parser.add_argument('confidence', type=float, required=True, location='args', help='탐지 신뢰도')
+upload_binary_parser.add_argument('box', type=str, required=True, location='args', help='탐지된 박스 좌표 x1,y1,x2,y2')
+upload_binary_parser.add_argument('extension', type=str, required=True, location='args', help='파일 확장자 (jpg, png 등)')
+upload_binary_parser.add_argument('crop_offset', type=str, default='0,0', location='args', help='이미지가 원본 프레임 크롭이면 크롭 시작 좌표 x,y')
+upload_binary_parser.add_argument('image_scale', type=float, default=1.0, location='args', help='이미지 축소 비율')
+upload_binary_parser.add_argument('upload_id', type=str, location='args', help='멱등 키 - 같은 값으로 다시 오면 저장 / 알림 없이 처음 결과를 응답')
+upload_binary_parser.add_argument('replayed', type=int, default=0, location='args', help='1 이면 스풀 재전송 (DB 에만 기록, ESP32 알림 안 함)')
+
+@ns.route('/uploadBinary')
+class UploadBinary(Resource):
+    @ns.expect(upload_binary_parser)
+    @ns.marshal_with(upload_response_model)
+    def post(self):
+        """
+        이미지 바이너리 업로드 API
+        - 요청 본문은 이미지 파일 바이트 그대로 (Content-Type: image/jpeg 등), 메타 정보는 쿼리 파라미터
+        - Base64 인코딩 / 디코딩 없이 본문을 조각 단위로 바로 디스크에 저장
+        """
+        cpu_start = time.thread_time()
+        try:
+            args = upload_binary_parser.parse_args()
+        except Exception as e:
+            return handle_exception("upload_binary", "필수 파라미터가 없습니다.", status_code=400)(e)
+
+        filepath = None
+        upload_id = args['upload_id']
+        try:
+            ext = args['extension']
+            if not is_allowed_extension(ext):
+                return handle_exception("upload_binary", f"지원하지 않는 파일 확장자: {ext}", status_code=400)(Exception(f"Unsupported extension: {ext}"))
+            box = [int(v) for v in args['box'].split(',')]
+            if len(box) != 4:
+                return handle_exception("upload_binary", "box 는 x1,y1,x2,y2 형식이어야 합니다.", status_code=400)(Exception(f"Invalid box: {args['box']}"))
+            crop_offset = [int(v) for v in args['crop_offset'].split(',')]
+            if len(crop_offset) != 2:
+                return handle_exception("upload_binary", "crop_offset 은 x,y 형식이어야 합니다.", status_code=400)(Exception(f"Invalid crop_offset: {args['crop_offset']}"))
+            if args['image_scale'] <= 0:
+                return handle_exception("upload_binary", "image_scale 은 0 보다 커야 합니다.", status_code=400)(Exception(f"Invalid image_scale: {args['image_scale']}"))
+
+            duplicate = claim_upload("upload_binary", upload_id, request.content_length, cpu_start)
+            if duplicate is not None:
+                return duplicate
+
+            detect_box_str = ','.join(map(str, box))
+            deepcycle_center_id = args["deepcycle_center_id"]
+            result_confidence = args["confidence"]
+            material_code = args["class"]
+            image_name = new_image_name(deepcycle_center_id, material_code, ext)
+            filepath = os.path.join(UPLOAD_FOLDER, image_name)
+
+            file_size = 0
+            with open(filepath, "wb") as f:
+                while True:
+                    chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    file_size += len(chunk)
+            if file_size == 0:
+                os.remove(filepath)
+                finish_upload(upload_id, None)
+                return handle_exception("upload_binary", "이미지 본문이 비어 있습니다.", status_code=400)(Exception("Empty body"))
+
+            save_image_transform(image_name, box, crop_offset, args['image_scale'])
+            insert_image_result(image_name, deepcycle_center_id, file_size, material_code, result_confidence, detect_box_str)
+            finish_upload(upload_id, image_name)
+            notify_esp32_unless_replayed(args['replayed'], deepcycle_center_id, material_code, image_name)
+            image_url = f"{DATA_SERVER_URL}/images/{image_name}"
+            return upload_response(image_url, request.content_length, cpu_start)
+        except Exception as e:
+            remove_upload(filepath)
+            finish_upload(upload_id, None)
+            return handle_exception("upload_binary", "이미지 업로드 중 오류가 발생했습니다.", status_code=500)(e)
+
 statistics_model = ns.model('StatisticsRequest', {
     'start_date': fields.String(required=True, description='조회 시작일 (YYYY-MM-DD)'),
     'end_date': fields.String(required=True, description='조회 종료일 (YYYY-MM-DD)'),